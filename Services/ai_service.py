@@ -2,7 +2,10 @@ import google.generativeai as genai
 from typing import Optional, List
 from googleapiclient.discovery import build
 import speech_recognition as sr
+import hashlib
+import json
 from config.settings import GEMINI_API_KEY, YOUTUBE_API_KEY
+from Services.cache import shared_cache, MISSING
 from PIL import Image
 
 class AIService:
@@ -15,6 +18,20 @@ class AIService:
         """Configure Gemini AI with API key."""
         genai.configure(api_key=GEMINI_API_KEY)
 
+    def _cached(self, name: str, args: tuple, loader):
+        """Return a cached AI result for these arguments, calling loader() on a miss.
+
+        Empty results are not cached so failed calls are retried next time.
+        """
+        digest = hashlib.sha256(json.dumps([name, args]).encode()).hexdigest()
+        key = f"ai:{name}:{digest}"
+        result = shared_cache.get(key, 'ai')
+        if result is MISSING:
+            result = loader()
+            if result:
+                shared_cache.set(key, result, 'ai')
+        return result
+
     def transcribe_speech(self, duration: int) -> Optional[str]:
         """Convert speech to text."""
         try:
@@ -55,6 +72,9 @@ class AIService:
 
     def summarize_text(self, text: str) -> Optional[str]:
         """Generate a summary of the provided text."""
+        return self._cached('summarize_text', (text,), lambda: self._summarize_text(text))
+
+    def _summarize_text(self, text: str) -> Optional[str]:
         try:
             if not text or not text.strip():
                 raise ValueError("Empty text provided")
@@ -80,6 +100,10 @@ class AIService:
 
     def recommend_videos(self, prompt: str, max_results: int = 3) -> Optional[List[dict]]:
         """Recommend YouTube videos based on a topic."""
+        return self._cached('recommend_videos', (prompt, max_results),
+                            lambda: self._recommend_videos(prompt, max_results))
+
+    def _recommend_videos(self, prompt: str, max_results: int) -> Optional[List[dict]]:
         try:
             print(f"Starting video search for prompt: {prompt}")  # Debug log
             
@@ -189,6 +213,10 @@ class AIService:
 
     def create_video_search_prompt(self, assignment_name: str, description: str) -> Optional[str]:
         """Create an optimized YouTube search prompt from assignment details."""
+        return self._cached('create_video_search_prompt', (assignment_name, description),
+                            lambda: self._create_video_search_prompt(assignment_name, description))
+
+    def _create_video_search_prompt(self, assignment_name: str, description: str) -> Optional[str]:
         try:
             if not assignment_name or not description:
                 print("Missing assignment name or description")
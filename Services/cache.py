@@ -0,0 +1,400 @@
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import (
+    CACHE_BACKEND,
+    CACHE_DEFAULT_TTL,
+    CACHE_MAX_ENTRIES,
+    CACHE_REDIS_URL,
+    CACHE_SQLITE_PATH,
+    CACHE_STALE_TTL,
+    CACHE_TTLS,
+)
+
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Interface shared by every cache backend.
+
+    Every entry belongs to a resource (e.g. 'courses', 'grades', 'ai'); the
+    resource picks its TTL and the bucket its hits and misses are counted
+    under. Subclasses implement _load/_store/delete/clear/_size.
+    """
+
+    name = 'base'
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES,
+                 ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = CACHE_DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._stats_lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+
+    def ttl_for(self, resource: str) -> float:
+        return self.ttls.get(resource, self.default_ttl)
+
+    @abstractmethod
+    def _load(self, key: str):
+        """Return the live value for key or MISSING"""
+
+    @abstractmethod
+    def _store(self, key: str, value: Any, ttl: float):
+        pass
+
+    @abstractmethod
+    def _size(self) -> int:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self, prefix: str = ''):
+        """Drop every entry, or only those whose key starts with prefix"""
+
+    def get(self, key: str, resource: str = 'default', default=MISSING):
+        """Return the cached value, or `default` when absent or expired"""
+        value = self._load(key)
+        with self._stats_lock:
+            if value is MISSING:
+                self.misses[resource] += 1
+            else:
+                self.hits[resource] += 1
+        return default if value is MISSING else value
+
+    def set(self, key: str, value: Any, resource: str = 'default', ttl: Optional[float] = None):
+        """Store a value under the resource's TTL unless ttl is given"""
+        self._store(key, value, self.ttl_for(resource) if ttl is None else ttl)
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], resource: str = 'default'):
+        """Return the cached value, calling loader() and caching its result on a miss"""
+        value = self.get(key, resource)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value, resource)
+        return value
+
+    def stats(self) -> Dict:
+        """Hit/miss counters per resource plus current size"""
+        with self._stats_lock:
+            resources = set(self.hits) | set(self.misses)
+            counters = {
+                resource: {'hits': self.hits[resource], 'misses': self.misses[resource]}
+                for resource in sorted(resources)
+            }
+            evictions = self.evictions
+        return {
+            'backend': self.name,
+            'size': self._size(),
+            'max_entries': self.max_entries,
+            'evictions': evictions,
+            'resources': counters
+        }
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe, size-bounded in-process LRU.
+
+    Values are stored by reference, so callers must copy before mutating.
+    """
+
+    name = 'memory'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def _store(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                with self._stats_lock:
+                    self.evictions += 1
+
+    def _size(self):
+        with self._lock:
+            return len(self._entries)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, prefix=''):
+        with self._lock:
+            if not prefix:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class SQLiteCache(CacheBackend):
+    """Cache persisted in a local SQLite file.
+
+    Survives restarts and is shared by every worker process on the host.
+    Values are pickled; the least recently read rows are evicted past
+    max_entries.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = CACHE_SQLITE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                ' key TEXT PRIMARY KEY,'
+                ' value BLOB NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)')
+
+    def _load(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return MISSING
+            if now >= row[1]:
+                self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                return MISSING
+            self._conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+        return pickle.loads(row[0])
+
+    def _store(self, key, value, ttl):
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?)', (key, blob, now + ttl, now))
+            overflow = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    'DELETE FROM cache WHERE key IN '
+                    '(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)', (overflow,))
+                with self._stats_lock:
+                    self.evictions += overflow
+
+    def _size(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self, prefix=''):
+        with self._lock, self._conn:
+            # substr() instead of LIKE so prefixes need no escaping
+            self._conn.execute('DELETE FROM cache WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+
+
+class RedisCache(CacheBackend):
+    """Cache stored in Redis (or anything speaking its protocol).
+
+    Expiry uses Redis key TTLs. The size bound is left to the server's
+    maxmemory-policy (use allkeys-lru); hit/miss counters are per process.
+    Pass `client` to use an existing connection such as fakeredis in tests.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url: str = CACHE_REDIS_URL, client=None,
+                 prefix: str = 'student_hub:', **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _load(self, key):
+        blob = self.client.get(self.prefix + key)
+        return MISSING if blob is None else pickle.loads(blob)
+
+    def _store(self, key, value, ttl):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(self.prefix + key, blob, px=max(1, int(ttl * 1000)))
+
+    def _size(self):
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + '*'))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self, prefix=''):
+        pattern = re.sub(r'([*?\[\]\\])', r'\\\1', self.prefix + prefix) + '*'
+        keys = list(self.client.scan_iter(match=pattern))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache(backend: str = CACHE_BACKEND, **kwargs) -> CacheBackend:
+    """Build the cache backend named in configuration"""
+    kwargs.setdefault('ttls', CACHE_TTLS)
+    if backend == 'memory':
+        return MemoryCache(**kwargs)
+    if backend == 'sqlite':
+        return SQLiteCache(**kwargs)
+    if backend == 'redis':
+        return RedisCache(**kwargs)
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+class StaleWhileRevalidate:
+    """Serve expired entries immediately while one background refresh rebuilds them.
+
+    Entries are stored as (value, fresh_until) and kept in the backend for
+    stale_ttl seconds past their resource TTL. Only a cold miss blocks the
+    caller, and concurrent cold misses for one key share a single load.
+    """
+
+    def __init__(self, backend: CacheBackend, stale_ttl: float = CACHE_STALE_TTL,
+                 max_workers: int = 4):
+        self.backend = backend
+        self.stale_ttl = stale_ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix='cache-refresh')
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._key_locks = {}
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load_and_store(self, key: str, loader: Callable[[], Any], resource: str):
+        value = loader()
+        fresh_ttl = self.backend.ttl_for(resource)
+        self.backend.set(key, (value, time.time() + fresh_ttl), resource,
+                         ttl=fresh_ttl + self.stale_ttl)
+        return value
+
+    def _refresh(self, key: str, loader: Callable[[], Any], resource: str):
+        try:
+            self._load_and_store(key, loader, resource)
+        except Exception as e:
+            print(f"Background refresh of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key: str, loader: Callable[[], Any], resource: str = 'default'):
+        entry = self.backend.get(key, resource)
+        if entry is MISSING:
+            with self._key_lock(key):
+                # Another request may have finished the load while we waited
+                entry = self.backend.get(key, resource)
+                if entry is MISSING:
+                    return self._load_and_store(key, loader, resource)
+
+        value, fresh_until = entry
+        if time.time() >= fresh_until:
+            with self._lock:
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if start_refresh:
+                self._pool.submit(self._refresh, key, loader, resource)
+        return value
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for and share its result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+# Memo for the request being handled; None outside a request. Worker threads
+# see it when their task is run inside contextvars.copy_context().
+_request_memo: ContextVar[Optional[Dict]] = ContextVar('request_memo', default=None)
+
+
+def begin_request_memo():
+    """Start an empty memo for the current request"""
+    _request_memo.set({})
+
+
+def end_request_memo():
+    _request_memo.set(None)
+
+
+def request_memoized(key: str, loader: Callable[[], Any]):
+    """Return the value loaded for key earlier in this request, else loader().
+
+    Outside a request this just calls loader(). Errors are not memoized.
+    """
+    memo = _request_memo.get()
+    if memo is None:
+        return loader()
+    value = memo.get(key, MISSING)
+    if value is MISSING:
+        value = memo[key] = loader()
+    return value
+
+
+# Shared by CanvasService, AIService and the route-level Flask cache
+shared_cache = create_cache()
+shared_swr = StaleWhileRevalidate(shared_cache)
+shared_flight = SingleFlight()
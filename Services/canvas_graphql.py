@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+PAGE_SIZE = 100
+
+_ASSIGNMENT_FIELDS = '''
+    _id
+    name
+    description
+    dueAt
+    pointsPossible
+    htmlUrl
+    updatedAt
+    submissionsConnection(first: 1) {
+      nodes { grade score submittedAt state }
+    }
+'''
+
+OVERVIEW_QUERY = '''
+query StudentHubOverview($first: Int!, $userId: ID!) {
+  allCourses {
+    _id
+    name
+    courseCode
+    updatedAt
+    applyGroupWeights
+    term { name }
+    enrollmentsConnection(filter: {types: [StudentEnrollment], userIds: [$userId]}) {
+      nodes {
+        state
+        user { _id }
+        grades { currentScore currentGrade finalScore }
+      }
+    }
+    assignmentsConnection(first: $first) {
+      pageInfo { hasNextPage endCursor }
+      nodes { %s }
+    }
+  }
+}
+''' % _ASSIGNMENT_FIELDS
+
+COURSE_ASSIGNMENTS_QUERY = '''
+query StudentHubCourseAssignments($courseId: ID!, $first: Int!, $after: String) {
+  course(id: $courseId) {
+    assignmentsConnection(first: $first, after: $after) {
+      pageInfo { hasNextPage endCursor }
+      nodes { %s }
+    }
+  }
+}
+''' % _ASSIGNMENT_FIELDS
+
+
+def _utc(value: Optional[str]) -> Optional[str]:
+    """GraphQL returns offsets (e.g. -05:00); REST callers expect ...Z in UTC"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def to_course(node: Dict) -> Dict:
+    return {
+        'id': int(node['_id']),
+        'name': node.get('name'),
+        'course_code': node.get('courseCode'),
+        'updated_at': _utc(node.get('updatedAt')),
+        'apply_assignment_group_weights': bool(node.get('applyGroupWeights')),
+        'term': node.get('term') or {}
+    }
+
+
+def to_assignment(node: Dict, course: Dict) -> Dict:
+    submissions = (node.get('submissionsConnection') or {}).get('nodes') or []
+    submission = submissions[0] if submissions else {}
+    return {
+        'id': int(node['_id']),
+        'name': node.get('name'),
+        'description': node.get('description'),
+        'due_at': _utc(node.get('dueAt')),
+        'points_possible': node.get('pointsPossible'),
+        'html_url': node.get('htmlUrl'),
+        'updated_at': _utc(node.get('updatedAt')),
+        'submission': {
+            'grade': submission.get('grade'),
+            'score': submission.get('score'),
+            'submitted_at': _utc(submission.get('submittedAt')),
+            'workflow_state': submission.get('state')
+        } if submission else {},
+        'course_id': course['id'],
+        'course_name': course['name']
+    }
+
+
+def active_student_enrollment(node: Dict, user_id) -> Optional[Dict]:
+    """The user's own active enrollment in a course.
+
+    OVERVIEW_QUERY already filters the connection to the user; the check is
+    repeated here so a server that ignores the filter can't hand back a
+    classmate's grade.
+    """
+    for enrollment in (node.get('enrollmentsConnection') or {}).get('nodes') or []:
+        if (enrollment.get('state') == 'active' and
+                str((enrollment.get('user') or {}).get('_id')) == str(user_id)):
+            return enrollment
+    return None
+
+
+def parse_overview(data: Dict, user_id, percentage_to_letter, fetch_more) -> Dict:
+    """Turn an OVERVIEW_QUERY result into {'classes', 'grades', 'assignments'}.
+
+    user_id is the current user's Canvas id. fetch_more(course_id, cursor)
+    returns the next assignmentsConnection page for courses whose
+    assignments did not fit in the first one.
+    """
+    classes: List[Dict] = []
+    grades: Dict[int, Optional[Dict]] = {}
+    assignments: List[Dict] = []
+
+    for node in data.get('allCourses') or []:
+        # Match the REST path, which only lists active enrollments
+        enrollment = active_student_enrollment(node, user_id)
+        if enrollment is None:
+            continue
+        course = to_course(node)
+        classes.append(course)
+
+        current_score = (enrollment.get('grades') or {}).get('currentScore')
+        grades[course['id']] = {
+            'percentage': current_score,
+            'letter': percentage_to_letter(current_score)
+        } if current_score is not None else None
+
+        connection = node.get('assignmentsConnection') or {}
+        while True:
+            assignments.extend(to_assignment(a, course) for a in connection.get('nodes') or [])
+            page_info = connection.get('pageInfo') or {}
+            if not page_info.get('hasNextPage'):
+                break
+            connection = fetch_more(course['id'], page_info.get('endCursor'))
+
+    return {'classes': classes, 'grades': grades, 'assignments': assignments}
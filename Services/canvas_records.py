@@ -0,0 +1,181 @@
+import dataclasses
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _Record:
+    """Read/write access by key so records stand in for the Canvas dicts they replace.
+
+    Only the names in `_keys` are exposed; `dict(record)` copies them.
+    """
+
+    __slots__ = ()
+    _keys: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self._keys:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key) -> bool:
+        # Like a Canvas payload: a key is present when it has a value
+        return key in self._keys and getattr(self, key) is not None
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in self._keys else None
+        return default if value is None else value
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._keys
+
+    def copy(self):
+        return dataclasses.replace(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON-ready dict of the exposed fields"""
+        return {key: value.to_dict() if isinstance(value, _Record) else value
+                for key, value in ((key, self[key]) for key in self._keys)}
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(timezone.utc)
+
+
+@dataclass(slots=True)
+class Course(_Record):
+    id: int
+    name: Optional[str] = None
+    course_code: Optional[str] = None
+    term: Optional[str] = None
+    updated_at: Optional[str] = None
+    apply_assignment_group_weights: bool = False
+
+    _keys = ('id', 'name', 'course_code', 'term', 'updated_at', 'apply_assignment_group_weights')
+
+    @classmethod
+    def from_canvas(cls, data) -> 'Course':
+        if isinstance(data, Course):
+            return data
+        term = data.get('term') or {}
+        return cls(id=data['id'], name=data.get('name'), course_code=data.get('course_code'),
+                   term=term.get('name') if isinstance(term, dict) else term,
+                   updated_at=data.get('updated_at'),
+                   apply_assignment_group_weights=bool(data.get('apply_assignment_group_weights')))
+
+
+@dataclass(slots=True)
+class Submission(_Record):
+    grade: Optional[str] = None
+    score: Optional[float] = None
+    submitted_at: Optional[str] = None
+    workflow_state: Optional[str] = None
+
+    _keys = ('grade', 'score', 'submitted_at', 'workflow_state')
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, key) is not None for key in self._keys)
+
+    @classmethod
+    def from_canvas(cls, data) -> 'Submission':
+        if isinstance(data, Submission):
+            return data
+        data = data or {}
+        return cls(grade=data.get('grade'), score=data.get('score'),
+                   submitted_at=data.get('submitted_at'), workflow_state=data.get('workflow_state'))
+
+
+@dataclass(slots=True)
+class Grade(_Record):
+    percentage: Optional[float] = None
+    letter: Optional[str] = None
+
+    _keys = ('percentage', 'letter')
+
+    @classmethod
+    def from_canvas(cls, data) -> Optional['Grade']:
+        if data is None or isinstance(data, Grade):
+            return data
+        return cls(percentage=data.get('percentage'), letter=data.get('letter'))
+
+
+@dataclass(slots=True)
+class Assignment(_Record):
+    """An assignment trimmed to the fields the app reads.
+
+    `due` is due_at parsed once into an aware UTC datetime. The HTML
+    description is kept zlib-compressed and only inflated when read.
+    """
+
+    id: int
+    course_id: Optional[int] = None
+    course_name: Optional[str] = None
+    name: Optional[str] = None
+    due_at: Optional[str] = None
+    due: Optional[datetime] = None
+    points_possible: Optional[float] = None
+    html_url: Optional[str] = None
+    updated_at: Optional[str] = None
+    submission_types: Tuple[str, ...] = ()
+    submission: Submission = dataclasses.field(default_factory=Submission)
+    _description: Optional[bytes] = None
+
+    _keys = ('id', 'course_id', 'course_name', 'name', 'description', 'due_at',
+             'points_possible', 'html_url', 'updated_at', 'submission_types', 'submission')
+
+    @property
+    def description(self) -> Optional[str]:
+        if self._description is None:
+            return None
+        return zlib.decompress(self._description).decode('utf-8')
+
+    @description.setter
+    def description(self, value: Optional[str]):
+        self._description = zlib.compress(value.encode('utf-8')) if value else None
+
+    @classmethod
+    def from_canvas(cls, data) -> 'Assignment':
+        if isinstance(data, Assignment):
+            return data
+        assignment = cls(
+            id=data['id'],
+            course_id=data.get('course_id'),
+            course_name=data.get('course_name'),
+            name=data.get('name'),
+            due_at=data.get('due_at'),
+            due=_parse_time(data.get('due_at')),
+            points_possible=data.get('points_possible'),
+            html_url=data.get('html_url'),
+            updated_at=data.get('updated_at'),
+            submission_types=tuple(data.get('submission_types') or ()),
+            submission=Submission.from_canvas(data.get('submission'))
+        )
+        assignment.description = data.get('description')
+        return assignment
+
+    def __setitem__(self, key: str, value):
+        _Record.__setitem__(self, key, value)
+        if key == 'due_at':
+            self.due = _parse_time(value)
+
+
+def courses_from_canvas(items) -> List[Course]:
+    return [Course.from_canvas(item) for item in items]
+
+
+def assignments_from_canvas(items) -> List[Assignment]:
+    return [Assignment.from_canvas(item) for item in items]
+
+
+def submissions_from_canvas(items) -> List[Dict]:
+    """Submission listings trimmed to the Submission fields plus assignment_id"""
+    return [dict(Submission.from_canvas(item).to_dict(), assignment_id=item['assignment_id'])
+            for item in items]
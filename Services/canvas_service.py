@@ -1,11 +1,45 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 import requests
 from canvasapi import Canvas
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from bisect import bisect_left
+from itertools import islice
+import calendar
 from os import getenv
 from dotenv import load_dotenv
-from functools import lru_cache
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
+import hashlib
+import threading
+from config.settings import CANVAS_MAX_WORKERS, CANVAS_FETCH_MODE
+from Services.canvas_transport import CanvasTransport
+from Services import canvas_graphql, grade_analytics, grade_projection
+from Services.canvas_records import Assignment, Grade, assignments_from_canvas, courses_from_canvas
+from Services.cache import shared_cache, shared_swr, shared_flight, request_memoized, MISSING
+
+_shared_service = None
+_shared_service_lock = threading.Lock()
+# Per-course fetches in flight across every request in the process
+_fan_out_slots = threading.BoundedSemaphore(max(1, CANVAS_MAX_WORKERS))
+# Set inside a fan-out task, whose slot then covers any fan-out it starts
+_in_fan_out = contextvars.ContextVar('canvas_in_fan_out', default=False)
+
+
+def get_canvas_service() -> 'CanvasService':
+    """Return the process-wide CanvasService shared by all requests"""
+    global _shared_service
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = CanvasService()
+    return _shared_service
+
+
+def _fan_out_task(fetch, course_id):
+    _in_fan_out.set(True)
+    with _fan_out_slots:
+        return fetch(course_id)
+
 
 class CanvasService:
     def __init__(self):
@@ -20,9 +54,17 @@ class CanvasService:
             
         self.canvas_url = self._format_canvas_url(self.canvas_url)
         self.canvas = Canvas(self.canvas_url, self.api_token)
-        self.headers = {"Authorization": f"Bearer {self.api_token}"}
-        self._cache = {}
-        self.cache_duration = 300  # 5 minutes in seconds
+        self.transport = CanvasTransport(self.canvas_url, self.api_token)
+        self._cache = shared_cache
+        # Keep entries for different Canvas accounts apart in the shared cache
+        self._cache_namespace = hashlib.sha256(
+            f"{self.canvas_url}:{self.api_token}".encode()).hexdigest()[:16]
+        # Per-thread so concurrent requests sharing this instance don't clash
+        self._local = threading.local()
+        # Local mirror kept up to date by the background sync worker
+        self.store = None
+        self.max_workers = max(1, CANVAS_MAX_WORKERS)
+        self.fetch_mode = CANVAS_FETCH_MODE
 
     def _format_canvas_url(self, url: str) -> str:
         """Format Canvas URL consistently"""
@@ -30,247 +72,633 @@ class CanvasService:
             url = f"https://{url}"
         return url.rstrip('/')
 
-    def _get_cached_data(self, key):
+    @property
+    def current_assignment(self) -> Optional[Dict]:
+        return getattr(self._local, 'current_assignment', None)
+
+    @current_assignment.setter
+    def current_assignment(self, value: Optional[Dict]):
+        self._local.current_assignment = value
+
+    @property
+    def current_course(self) -> Optional[Dict]:
+        return getattr(self._local, 'current_course', None)
+
+    @current_course.setter
+    def current_course(self, value: Optional[Dict]):
+        self._local.current_course = value
+
+    def _get_cached_data(self, key, resource='default'):
         """Get cached data if it exists and is not expired"""
-        if key in self._cache:
-            data, timestamp = self._cache[key]
-            if time.time() - timestamp < self.cache_duration:
-                return data
-        return None
+        data = self._cache.get(f"{self._cache_namespace}:{key}", resource)
+        return None if data is MISSING else data
+
+    def _set_cached_data(self, key, data, resource='default'):
+        """Cache data under the resource's TTL"""
+        self._cache.set(f"{self._cache_namespace}:{key}", data, resource)
+
+    def _cached(self, key, resource, loader):
+        """Return cached data, calling loader() on a miss. Errors are not cached.
+
+        Within one request a key is read at most once, and concurrent misses
+        for the same key share a single loader() call.
+        """
+        cache_key = f"{self._cache_namespace}:{key}"
+
+        def load():
+            value = self._cache.get(cache_key, resource)
+            if value is MISSING:
+                value = shared_flight.do(
+                    cache_key, lambda: self._cache.get_or_set(cache_key, loader, resource))
+            return value
+        return request_memoized(cache_key, load)
+
+    def _memoized(self, key, loader):
+        """Deduplicate an uncached call within the current request"""
+        return request_memoized(f"{self._cache_namespace}:{key}", loader)
+
+    def _swr(self, key, resource, loader):
+        """Like _cached, but expired data is served while a background refresh runs"""
+        return shared_swr.get(f"{self._cache_namespace}:swr:{key}", loader, resource)
+
+    def attach_store(self, store):
+        """Serve reads from a synced CanvasStore instead of calling Canvas"""
+        self.store = store
+
+    def _store_ready(self) -> bool:
+        return self.store is not None and self.store.is_ready()
 
-    def _set_cached_data(self, key, data):
-        """Cache data with current timestamp"""
-        self._cache[key] = (data, time.time())
+    # Stale-while-revalidate entries built from each kind of synced data
+    DASHBOARD_SOURCES = {
+        'grades': ('dashboard_grades',),
+        'assignments': ('calendar_index',)
+    }
+
+    def invalidate_dashboard(self, changed=('grades', 'assignments')):
+        """Drop the cached dashboard sources built from the changed kinds of data"""
+        for kind in changed:
+            for key in self.DASHBOARD_SOURCES.get(kind, ()):
+                self._cache.delete(f"{self._cache_namespace}:swr:{key}")
+
+    def _paginate(self, endpoint: str, params: Optional[Dict] = None,
+                  limit: Optional[int] = None, transform=None) -> Iterator[Dict]:
+        """Lazily yield items across all pages of a Canvas list endpoint.
+
+        Stops after `limit` items without downloading the remaining pages.
+        `transform` turns each decoded page into records (see canvas_records).
+        """
+        if limit is not None and limit <= 0:
+            return
+        pages = self.transport.iter_pages(endpoint, params=params, transform=transform)
+        count = 0
+        try:
+            for page in pages:
+                for item in page:
+                    yield item
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+        finally:
+            pages.close()
+
+    def _iter_fan_out(self, fetch, course_ids):
+        """Run fetch(course_id) for each course concurrently.
+
+        At most CANVAS_MAX_WORKERS fetches run at once in the whole process,
+        however many requests fan out together. Yields (course_id, result,
+        error) tuples in completion order; error is None on success and the
+        exception message otherwise.
+        """
+        course_ids = list(dict.fromkeys(course_ids))
+        if not course_ids:
+            return
+        if _in_fan_out.get():
+            # Waiting for more slots here could deadlock once every slot is
+            # held by a task like this one, so fetch inline under its slot
+            for course_id in course_ids:
+                yield self._fan_out_outcome(course_id, lambda: fetch(course_id))
+            return
+        workers = min(self.max_workers, len(course_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each task runs in a copy of the caller's context so it shares the request memo
+            futures = {executor.submit(contextvars.copy_context().run, _fan_out_task, fetch, course_id): course_id
+                       for course_id in course_ids}
+            for future in as_completed(futures):
+                yield self._fan_out_outcome(futures[future], future.result)
+
+    def _fan_out_outcome(self, course_id, result) -> tuple:
+        try:
+            return course_id, result(), None
+        except Exception as e:
+            print(f"Error fetching course {course_id}: {e}")
+            return course_id, None, str(e)
+
+    def _fan_out(self, fetch, course_ids) -> Dict[str, Dict]:
+        """Run fetch for every course concurrently and collect the outcome.
+
+        Returns {'results': {course_id: value}, 'errors': {course_id: message}}.
+        """
+        results = {}
+        errors = {}
+        for course_id, result, error in self._iter_fan_out(fetch, course_ids):
+            if error is None:
+                results[course_id] = result
+            else:
+                errors[course_id] = error
+        return {'results': results, 'errors': errors}
+
+    def _fetch_self(self) -> Dict:
+        """{'id', 'name'} of the token's user (cached)"""
+        def load():
+            user = self.transport.get_json("/api/v1/users/self")
+            return {'id': user.get('id'), 'name': user.get('name')}
+        return self._cached('user_self', 'user_name', load)
+
+    def _fetch_user_name(self) -> Optional[str]:
+        return self._fetch_self().get('name')
 
-    @lru_cache(maxsize=32)
     def get_user_name(self) -> Optional[str]:
         """Get current user's full name (cached)"""
-        endpoint = f"{self.canvas_url}/api/v1/users/self"
         try:
-            response = requests.get(endpoint, headers=self.headers)
-            response.raise_for_status()
-            return response.json().get('name')
+            return self._fetch_user_name()
         except requests.exceptions.RequestException as e:
             print(f"Error getting user name: {str(e)}")
             return None
 
-    def get_classes(self) -> List[Dict]:
-        """Get user's active classes (cached)"""
-        cache_key = 'classes'
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
-
-        endpoint = f"{self.canvas_url}/api/v1/courses"
+    def _load_course_list(self, transform=None) -> List[Dict]:
+        """Active courses straight from Canvas; shared by the sync worker"""
         params = {
             'enrollment_state': 'active',
             'include[]': ['term', 'teachers'],
             'per_page': 100
         }
+        return list(self._paginate("/api/v1/courses", params=params, transform=transform))
+
+    def _fetch_classes(self) -> List[Dict]:
+        if self._store_ready():
+            return courses_from_canvas(self.store.get_classes())
+        return self._cached('classes', 'courses',
+                            lambda: self._load_course_list(transform=courses_from_canvas))
+
+    def get_classes(self) -> List[Dict]:
+        """Get user's active classes (cached)"""
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            self._set_cached_data(cache_key, result)
-            return result
+            return self._fetch_classes()
         except requests.exceptions.RequestException as e:
             print(f"Error fetching courses: {e}")
             return []
 
-    def get_course_professor(self, course_id: int) -> Optional[str]:
-        """Get professor name for a specific course"""
-        try:
+    def _fetch_course_professor(self, course_id: int) -> Optional[str]:
+        def load():
             course = self.canvas.get_course(course_id)
             teachers = course.get_users(enrollment_type=['teacher'])
             for teacher in teachers:
                 return teacher.name
             return None
+        return self._cached(f'professor:{course_id}', 'courses', load)
+
+    def get_course_professor(self, course_id: int) -> Optional[str]:
+        """Get professor name for a specific course"""
+        try:
+            return self._fetch_course_professor(course_id)
         except Exception as e:
             print(f"Error: {str(e)}")
             return None
 
+    def get_course_professor_many(self, course_ids: List[int]) -> Dict[str, Dict]:
+        """Get professor names for several courses concurrently"""
+        return self._fan_out(self._fetch_course_professor, course_ids)
+
     def _percentage_to_letter_grade(self, percentage: float) -> str:
         """Convert percentage to letter grade"""
-        if percentage is None:
-            return 'N/A'
-        
-        if percentage >= 93: return 'A'
-        elif percentage >= 90: return 'A-'
-        elif percentage >= 87: return 'B+'
-        elif percentage >= 83: return 'B'
-        elif percentage >= 80: return 'B-'
-        elif percentage >= 77: return 'C+'
-        elif percentage >= 73: return 'C'
-        elif percentage >= 70: return 'C-'
-        elif percentage >= 67: return 'D+'
-        elif percentage >= 63: return 'D'
-        elif percentage >= 60: return 'D-'
-        else: return 'F'
-
-    def get_grades(self, course_id: int) -> Optional[float]:
-        """Get grades for a specific course"""
-        endpoint = f"{self.canvas_url}/api/v1/courses/{course_id}/enrollments"
+        return grade_analytics.DEFAULT_SCALE.letter(percentage)
+
+    def _load_enrollment_grade(self, course_id: int) -> Optional[Grade]:
+        """The student's current grade straight from Canvas; shared by the sync worker"""
+        endpoint = f"/api/v1/courses/{course_id}/enrollments"
         params = {
             "type[]": ["StudentEnrollment"],
             "user_id": "self",
             "include[]": ["current_grade", "current_score"],
             "per_page": 100
         }
+        # Return the first enrollment that has grade data
+        for enrollment in self._paginate(endpoint, params=params):
+            grades = enrollment.get('grades', {})
+            current_score = grades.get('current_score')
+            if current_score is not None:
+                return Grade(percentage=current_score,
+                             letter=self._percentage_to_letter_grade(current_score))
+        return None
+
+    def _fetch_grades(self, course_id: int) -> Optional[Dict]:
+        if self._store_ready():
+            return Grade.from_canvas(self.store.get_grade(course_id))
+        return self._cached(f'grades:{course_id}', 'grades',
+                            lambda: self._load_enrollment_grade(course_id))
+
+    def get_grades(self, course_id: int) -> Optional[Dict]:
+        """Get grades for a specific course"""
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            enrollments = response.json()
-            
-            # Return the first enrollment that has grade data
-            for enrollment in enrollments:
-                grades = enrollment.get('grades', {})
-                current_score = grades.get('current_score')
-                if current_score is not None:
-                    return {
-                        'percentage': current_score,
-                        'letter': self._percentage_to_letter_grade(current_score)
-                    }
-            return None
+            return self._fetch_grades(course_id)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching grades for course {course_id}: {e}")
             return None
 
-    def get_current_assignments(self, course_id: int) -> List[Dict]:
-        """Get current assignments for a specific course"""
-        endpoint = f"{self.canvas_url}/api/v1/courses/{course_id}/assignments"
+    def get_grades_many(self, course_ids: List[int]) -> Dict[str, Dict]:
+        """Get grades for several courses concurrently"""
+        return self._fan_out(self._fetch_grades, course_ids)
+
+    def _fetch_current_assignments(self, course_id: int, limit: Optional[int] = None) -> List[Dict]:
+        if self._store_ready():
+            return assignments_from_canvas(self.store.get_upcoming_assignments(course_id, limit=limit))
+        endpoint = f"/api/v1/courses/{course_id}/assignments"
         params = {
             "order_by": "due_at",
             "include[]": ["submission"],
-            "bucket": "upcoming",
-            "per_page": 100
+            "bucket": "future",
+            "per_page": 100 if limit is None else min(limit, 100)
         }
+
+        def load():
+            # Same rule as the store and the course page views: due from now on.
+            # Canvas's future bucket also lists undated assignments
+            now = datetime.now(timezone.utc)
+            assignments = self._paginate(endpoint, params=params, transform=assignments_from_canvas)
+            try:
+                return list(islice((a for a in assignments if a.due is not None and a.due >= now), limit))
+            finally:
+                assignments.close()
+        return self._cached(f'current_assignments:{course_id}:{limit}', 'assignments', load)
+
+    def get_current_assignments(self, course_id: int, limit: Optional[int] = None) -> List[Dict]:
+        """Assignments of a course due from now on, soonest first, optionally only the first `limit`"""
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch_current_assignments(course_id, limit)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching assignments: {e}")
             return []
 
-    def get_all_assignments(self) -> List[Dict]:
-        """Get all assignments (cached)"""
+    def get_current_assignments_many(self, course_ids: List[int]) -> Dict[str, Dict]:
+        """Get current assignments for several courses concurrently"""
+        return self._fan_out(self._fetch_current_assignments, course_ids)
+
+    def iter_current_assignments_many(self, course_ids: List[int]) -> Iterator:
+        """Like get_current_assignments_many, but yields (course_id, assignments, error) as each course finishes"""
+        return self._iter_fan_out(self._fetch_current_assignments, course_ids)
+
+    def _fetch_course_assignments(self, course_id: int) -> List[Dict]:
+        if self._store_ready():
+            return assignments_from_canvas(self.store.get_assignments(course_id))
+        endpoint = f"/api/v1/courses/{course_id}/assignments"
+        params = {
+            "include[]": ["submission"],
+            "per_page": 100
+        }
+        return self._cached(f'assignments:{course_id}', 'assignments', lambda: list(
+            self._paginate(endpoint, params=params, transform=assignments_from_canvas)))
+
+    def _fetch_all_assignments(self) -> Dict[str, Dict]:
+        """Assignments of every active course plus the courses that failed.
+
+        Returns {'results': [assignment, ...], 'errors': {course_id: message}}.
+        """
+        if self._store_ready():
+            return {'results': assignments_from_canvas(self.store.get_assignments()), 'errors': {}}
+        if self.fetch_mode == 'graphql':
+            return {'results': self._fetch_graphql_overview()['assignments'], 'errors': {}}
+
         cache_key = 'all_assignments'
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
+        cached_data = self._get_cached_data(cache_key, 'assignments')
+        if cached_data is not None:
+            return {'results': cached_data, 'errors': {}}
+
+        # First get all active courses
+        courses = self._fetch_classes()
 
+        # Then get assignments for every course concurrently
+        fetched = self._fan_out(self._fetch_course_assignments, [c['id'] for c in courses])
+
+        # Add course information to copies of the assignments, keeping course
+        # order; the cached records are also the transport's 304 bodies
         assignments = []
+        for course in courses:
+            course_id = course['id']
+            for assignment in fetched['results'].get(course_id, []):
+                assignment = assignment.copy()
+                assignment['course_name'] = course.get('name')
+                assignment['course_id'] = course_id
+                assignments.append(assignment)
+
+        # Don't cache a partial crawl; the failed courses get retried next time
+        if not fetched['errors']:
+            self._set_cached_data(cache_key, assignments, 'assignments')
+        return {'results': assignments, 'errors': fetched['errors']}
+
+    def get_all_assignments(self) -> List[Dict]:
+        """Get all assignments (cached)"""
         try:
-            # First get all active courses
-            courses = self.get_classes()
-            
-            # Then get assignments for each course
-            for course in courses:
-                course_id = course['id']
-                endpoint = f"{self.canvas_url}/api/v1/courses/{course_id}/assignments"
-                params = {
-                    "include[]": ["submission"],
-                    "per_page": 100
-                }
-                
-                response = requests.get(endpoint, headers=self.headers, params=params)
-                response.raise_for_status()
-                course_assignments = response.json()
-                
-                # Add course information to each assignment
-                for assignment in course_assignments:
-                    assignment['course_name'] = course.get('name')
-                    assignment['course_id'] = course_id
-                    assignments.append(assignment)
-                    
-            result = assignments
-            self._set_cached_data(cache_key, result)
-            return result
+            return self._fetch_all_assignments()['results']
         except requests.exceptions.RequestException as e:
             print(f"Error fetching all assignments: {e}")
             return []
 
+    def get_assignments_due_between(self, start: datetime, end: datetime,
+                                    assignments: Optional[List[Dict]] = None) -> List[Dict]:
+        """Assignments across all courses due in [start, end), soonest first.
+
+        Answered by the local store's due-date index once it has synced;
+        otherwise `assignments` (default: get_all_assignments()) is scanned.
+        Naive datetimes are local time.
+        """
+        if self._store_ready():
+            return assignments_from_canvas(self.store.get_assignments_due_between(start, end))
+
+        start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+        due = []
+        for assignment in self.get_all_assignments() if assignments is None else assignments:
+            assignment = Assignment.from_canvas(assignment)
+            if assignment.due is not None and start <= assignment.due < end:
+                due.append(assignment)
+        due.sort(key=lambda a: a.due)
+        return due
+
+    def _build_calendar_index(self, assignments: List[Dict]) -> Dict:
+        """Bucket assignments by local (year, month) and day of month, soonest first"""
+        index = {}
+        for assignment in sorted((a for a in assignments if a.due is not None), key=lambda a: a.due):
+            due = assignment.due.astimezone()
+            index.setdefault((due.year, due.month), {}).setdefault(due.day, []).append({
+                'id': assignment['id'],
+                'course_id': assignment['course_id'],
+                'name': assignment['name'],
+                'course_name': assignment['course_name']
+            })
+        return index
+
+    def _calendar_index(self) -> Dict:
+        def load():
+            fetched = self._fetch_all_assignments()
+            if fetched['errors']:
+                raise requests.exceptions.RequestException(f"Failed courses: {fetched['errors']}")
+            return self._build_calendar_index(fetched['results'])
+        # Rebuilt once per data refresh and dropped with the dashboard after a sync
+        return self._swr('calendar_index', 'assignments', load)
+
+    def get_calendar_month(self, year: int, month: int, today: Optional[datetime] = None) -> Dict:
+        """The dashboard calendar for one month.
+
+        Returns {'year', 'month', 'label', 'days': [{'day', 'in_month',
+        'is_today', 'assignments'}]} starting on Sunday, with last month's
+        trailing days first. Assignments come from an index built once per
+        data refresh, so each month is a dictionary lookup.
+        """
+        today = today or datetime.now()
+        try:
+            by_day = self._calendar_index().get((year, month), {})
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching calendar assignments: {e}")
+            by_day = {}
+
+        weeks = calendar.Calendar(firstweekday=calendar.SUNDAY).monthdayscalendar(year, month)
+        days = []
+        # Last month's days before the 1st
+        leading = weeks[0].index(1)
+        if leading:
+            last_month = datetime(year, month, 1) - timedelta(days=1)
+            last_day = calendar.monthrange(last_month.year, last_month.month)[1]
+            days.extend({'day': last_day - leading + i + 1, 'in_month': False,
+                         'is_today': False, 'assignments': []} for i in range(leading))
+        is_this_month = (today.year, today.month) == (year, month)
+        for week in weeks:
+            for day in week:
+                if day:
+                    days.append({'day': day, 'in_month': True,
+                                 'is_today': is_this_month and day == today.day,
+                                 'assignments': by_day.get(day, [])})
+        return {
+            'year': year,
+            'month': month,
+            'label': datetime(year, month, 1).strftime('%B %Y'),
+            'days': days
+        }
+
+    def _fetch_graphql_overview(self) -> Dict:
+        """Courses, grades and assignments from one GraphQL query (cached).
+
+        Fills the same shapes as the REST methods: {'classes': [...],
+        'grades': {course_id: grade}, 'assignments': [...]}. Courses with more
+        than one page of assignments cost one extra query per page.
+        """
+        def fetch_more(course_id, cursor):
+            data = self.transport.graphql(canvas_graphql.COURSE_ASSIGNMENTS_QUERY, {
+                'courseId': str(course_id), 'first': canvas_graphql.PAGE_SIZE, 'after': cursor})
+            return (data.get('course') or {}).get('assignmentsConnection') or {}
+
+        def load():
+            user_id = self._fetch_self()['id']
+            # Filtered to the user's enrollment so a course's roster isn't downloaded
+            data = self.transport.graphql(canvas_graphql.OVERVIEW_QUERY,
+                                          {'first': canvas_graphql.PAGE_SIZE, 'userId': str(user_id)})
+            overview = canvas_graphql.parse_overview(data, user_id,
+                                                     self._percentage_to_letter_grade, fetch_more)
+            return {
+                'classes': courses_from_canvas(overview['classes']),
+                'grades': {course_id: Grade.from_canvas(grade)
+                           for course_id, grade in overview['grades'].items()},
+                'assignments': assignments_from_canvas(overview['assignments'])
+            }
+
+        return self._cached('graphql_overview', 'assignments', load)
+
+    def _fetch_assignment_groups(self, course_id: int) -> List[Dict]:
+        endpoint = f"/api/v1/courses/{course_id}/assignment_groups"
+        params = {
+            "include[]": ["assignments", "submission"],
+            "exclude_response_fields[]": ["description", "rubric"],
+            "per_page": 100
+        }
+        return self._cached(f'assignment_groups:{course_id}', 'assignments', lambda: list(
+            self._paginate(endpoint, params=params,
+                           transform=grade_projection.summarize_assignment_groups)))
+
+    def _fetch_grade_projector(self) -> grade_projection.GradeProjector:
+        def load():
+            classes = self._fetch_classes()
+            fetched = self._fan_out(self._fetch_assignment_groups, [c['id'] for c in classes])
+            if fetched['errors']:
+                raise requests.exceptions.RequestException(f"Failed courses: {fetched['errors']}")
+            weighted = {c['id']: c.get('apply_assignment_group_weights', False) for c in classes}
+            return grade_projection.GradeProjector.from_assignment_groups(fetched['results'], weighted)
+        return self._cached('grade_projector', 'grades', load)
+
+    def get_grade_projector(self) -> Optional[grade_projection.GradeProjector]:
+        """What-if grade projections for every active course (cached).
+
+        Assignment groups are fetched once per TTL; queries on the returned
+        projector never call Canvas.
+        """
+        try:
+            return self._fetch_grade_projector()
+        except requests.exceptions.RequestException as e:
+            print(f"Error building grade projections: {e}")
+            return None
+
+    def get_dashboard_grades(self) -> Dict:
+        """{'classes', 'grades'} for the dashboard, served stale-while-revalidate"""
+        def load():
+            if self.fetch_mode == 'graphql' and not self._store_ready():
+                overview = self._fetch_graphql_overview()
+                return {'classes': overview['classes'], 'grades': overview['grades']}
+            classes = self._fetch_classes()
+            grades = self.get_grades_many([c['id'] for c in classes])
+            if grades['errors']:
+                raise requests.exceptions.RequestException(f"Failed courses: {grades['errors']}")
+            return {'classes': classes, 'grades': grades['results']}
+
+        try:
+            return self._swr('dashboard_grades', 'grades', load)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching dashboard grades: {e}")
+            return {'classes': [], 'grades': {}}
+
+    def get_dashboard_profile(self) -> Dict:
+        """{'user_name', 'user_avatar'} for the dashboard, served stale-while-revalidate"""
+        def load():
+            return {'user_name': self._fetch_user_name(),
+                    'user_avatar': self._fetch_profile_picture()}
+
+        try:
+            return self._swr('dashboard_profile', 'user_name', load)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching dashboard profile: {e}")
+            return {'user_name': None, 'user_avatar': None}
+
+    def _fetch_enrollment_history(self) -> List[Dict]:
+        """Every active and completed student enrollment as grade_analytics rows"""
+        params = {
+            "type[]": ["StudentEnrollment"],
+            "state[]": ["active", "completed"],
+            "per_page": 100
+        }
+
+        def load():
+            return [{'course_id': enrollment.get('course_id'),
+                     'percentage': (enrollment.get('grades') or {}).get('final_score')}
+                    for enrollment in self._paginate("/api/v1/users/self/enrollments", params=params)]
+        return self._cached('enrollment_history', 'grades', load)
+
     def get_current_year(self) -> Optional[str]:
         """Get student's current academic year"""
         try:
-            user = self.canvas.get_current_user()
-            enrollments = user.get_enrollments()
-            
-            total_credits = 0
-            for enrollment in enrollments:
-                if hasattr(enrollment, 'grades') and enrollment.grades.get('final_score'):
-                    if enrollment.grades['final_score'] >= 60:
-                        total_credits += 3
-            
-            if total_credits < 30:
-                return "Freshman"
-            elif total_credits < 60:
-                return "Sophomore"
-            elif total_credits < 90:
-                return "Junior"
-            else:
-                return "Senior"
+            summary = grade_analytics.summarize(self._fetch_enrollment_history())
+            return grade_analytics.class_standing(summary['earned_credits'])
         except Exception as e:
             print(f"Error determining year: {str(e)}")
             return None
 
+    def _fetch_profile_picture(self) -> Optional[str]:
+        def load():
+            avatars = self.transport.get_json("/api/v1/users/self/avatars")
+            # Return the URL of the first avatar (usually the current one)
+            return avatars[0]['url'] if avatars else None
+        return self._cached('avatar', 'avatar', load)
+
     def get_user_profile_picture(self) -> Optional[str]:
         """Get current user's profile picture URL"""
-        endpoint = f"{self.canvas_url}/api/v1/users/self/avatars"
         try:
-            response = requests.get(endpoint, headers=self.headers)
-            response.raise_for_status()
-            avatars = response.json()
-            # Return the URL of the first avatar (usually the current one)
-            return avatars[0]['url'] if avatars else None
+            return self._fetch_profile_picture()
         except requests.exceptions.RequestException as e:
             print(f"Error fetching profile picture: {str(e)}")
             return None
 
+    def _build_assignment_index(self, assignments: List[Dict]) -> Dict:
+        """Sort a course's assignments once so views only bisect on now.
+
+        `dated` is by due date. `past_order` holds positions in `dated`,
+        most recently submitted first, so the past view is a filter on them.
+        """
+        dated = []
+        undated = []
+        for assignment in assignments_from_canvas(assignments):
+            if assignment.due is not None:
+                dated.append((assignment.due.timestamp(), assignment))
+            else:
+                undated.append(assignment)
+        dated.sort(key=lambda item: item[0])
+        undated.sort(key=lambda a: a.get('name') or '')
+        past_order = sorted(range(len(dated)), reverse=True,
+                            key=lambda i: (dated[i][1].get('submission') or {}).get('submitted_at') or '')
+        return {
+            'due_ts': [ts for ts, _ in dated],
+            'dated': [assignment for _, assignment in dated],
+            'past_order': past_order,
+            'undated': undated
+        }
+
+    def _assignment_index(self, course_id: int) -> Dict:
+        def build():
+            return self._build_assignment_index(self._fetch_course_assignments(course_id))
+        if self._store_ready():
+            return self._memoized(f'assignment_index:{course_id}', build)
+        return self._cached(f'assignment_index:{course_id}', 'assignments', build)
+
+    def _fetch_assignment_views(self, course_id: int, now: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+        index = self._assignment_index(course_id)
+        now = now or datetime.now(timezone.utc)
+        split = bisect_left(index['due_ts'], now.timestamp())
+        return {
+            'upcoming': index['dated'][split:],
+            'past': [index['dated'][i] for i in index['past_order'] if i < split],
+            'undated': index['undated']
+        }
+
+    def get_assignment_views(self, course_id: int, now: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+        """A course's assignments from one download, split around `now`.
+
+        Returns {'upcoming': soonest due first, 'past': most recently
+        submitted first, 'undated': by name}. The sorted index behind the
+        views is cached, so each call only bisects it.
+        """
+        try:
+            return self._fetch_assignment_views(course_id, now)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching assignments for course {course_id}: {e}")
+            return {'upcoming': [], 'past': [], 'undated': []}
+
+    def _fetch_past_assignments(self, course_id: int) -> List[Dict]:
+        return [self._past_assignment_summary(a)
+                for a in self._fetch_assignment_views(course_id)['past']]
+
+    def _past_assignment_summary(self, assignment: Dict) -> Dict:
+        submission = assignment.get('submission') or {}
+        return {
+            'id': assignment['id'],  # Added assignment ID
+            'name': assignment['name'],
+            'grade': submission.get('grade', 'N/A'),
+            'submitted_at': submission.get('submitted_at'),
+            'due_at': assignment['due_at']
+        }
+
     def get_past_assignments(self, course_id: int) -> List[Dict]:
         """Get past assignments with grades for a specific course."""
-        endpoint = f"{self.canvas_url}/api/v1/courses/{course_id}/assignments"
-        params = {
-            "include[]": ["submission"],
-            "order_by": "due_at",
-            "per_page": 100
-        }
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            response.raise_for_status()
-            assignments = response.json()
-            
-            past_assignments = []
-            current_time = datetime.now()
-            
-            for assignment in assignments:
-                if assignment.get('due_at'):
-                    due_date = datetime.strptime(assignment['due_at'], '%Y-%m-%dT%H:%M:%SZ')
-                    if due_date < current_time:
-                        submission = assignment.get('submission', {})
-                        past_assignments.append({
-                            'id': assignment['id'],  # Added assignment ID
-                            'name': assignment['name'],
-                            'grade': submission.get('grade', 'N/A'),
-                            'submitted_at': submission.get('submitted_at'),
-                            'due_at': assignment['due_at']
-                        })
-            
-            past_assignments.sort(key=lambda x: x['submitted_at'] if x['submitted_at'] else '', reverse=True)
-            return past_assignments
-            
+            return self._fetch_past_assignments(course_id)
         except Exception as e:
             print(f"Error fetching past assignments: {e}")
             return []
 
+    def get_past_assignments_many(self, course_ids: List[int]) -> Dict[str, Dict]:
+        """Get past assignments for several courses concurrently"""
+        return self._fan_out(self._fetch_past_assignments, course_ids)
+
     def get_assignment_details(self, course_id: int, assignment_id: int) -> Optional[Dict]:
         """Get detailed information about a specific assignment."""
         try:
             # Get assignment details
-            endpoint = f"{self.canvas_url}/api/v1/courses/{course_id}/assignments/{assignment_id}"
-            response = requests.get(endpoint, headers=self.headers)
-            response.raise_for_status()
-            assignment = response.json()
+            endpoint = f"/api/v1/courses/{course_id}/assignments/{assignment_id}"
+            assignment = self._cached(f'assignment:{course_id}:{assignment_id}', 'assignments',
+                                      lambda: self.transport.get_json(endpoint))
 
             # Get course details
             courses = self.get_classes()
@@ -0,0 +1,226 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config.settings import CANVAS_STORE_MAX_AGE, CANVAS_STORE_PATH
+
+
+class CanvasStore:
+    """Local SQLite copy of the student's courses, grades and assignments.
+
+    Filled by the background sync worker so pages can render without calling
+    Canvas. Raw Canvas JSON is kept in a `data` column next to the few fields
+    the sync compares on.
+    """
+
+    def __init__(self, path: str = CANVAS_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS courses (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT,
+                    position INTEGER,
+                    updated_at TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS grades (
+                    course_id INTEGER PRIMARY KEY,
+                    current_score REAL,
+                    letter TEXT
+                );
+                CREATE TABLE IF NOT EXISTS assignments (
+                    id INTEGER PRIMARY KEY,
+                    course_id INTEGER NOT NULL,
+                    due_at TEXT,
+                    due_ts INTEGER,
+                    points_possible REAL,
+                    updated_at TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS assignments_due ON assignments (due_ts);
+                CREATE INDEX IF NOT EXISTS assignments_course_due ON assignments (course_id, due_ts);
+                CREATE TABLE IF NOT EXISTS submissions (
+                    assignment_id INTEGER PRIMARY KEY,
+                    course_id INTEGER NOT NULL,
+                    workflow_state TEXT,
+                    submitted_at TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            ''')
+
+    def get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_state(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, value))
+
+    def is_ready(self, max_age: float = CANVAS_STORE_MAX_AGE) -> bool:
+        """True when a full sync completed within the last max_age seconds.
+
+        A store that stopped syncing (e.g. the token was revoked) is not
+        trusted past that, so reads go back to Canvas.
+        """
+        last_sync = self.get_state('last_sync')
+        return last_sync is not None and time.time() - _timestamp(last_sync) <= max_age
+
+    def replace_courses(self, courses: List[Dict]) -> List[int]:
+        """Store the active course list, dropping courses that left it.
+
+        Returns the ids of courses that are new, removed or whose updated_at changed.
+        """
+        with self._lock, self._conn:
+            known = {row['id']: row['updated_at']
+                     for row in self._conn.execute('SELECT id, updated_at FROM courses')}
+            changed = [c['id'] for c in courses if known.get(c['id'], object()) != c.get('updated_at')]
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO courses (id, name, position, updated_at, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(c['id'], c.get('name'), position, c.get('updated_at'), json.dumps(_as_dict(c)))
+                 for position, c in enumerate(courses)])
+            gone = set(known) - {c['id'] for c in courses}
+            for course_id in gone:
+                for table, column in (('courses', 'id'), ('grades', 'course_id'),
+                                      ('assignments', 'course_id'), ('submissions', 'course_id')):
+                    self._conn.execute(f'DELETE FROM {table} WHERE {column} = ?', (course_id,))
+        return changed + sorted(gone)
+
+    def get_classes(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute('SELECT data FROM courses ORDER BY position').fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def set_grade(self, course_id: int, grade: Optional[Dict]):
+        with self._lock, self._conn:
+            if grade is None:
+                self._conn.execute('DELETE FROM grades WHERE course_id = ?', (course_id,))
+            else:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO grades (course_id, current_score, letter) VALUES (?, ?, ?)',
+                    (course_id, grade['percentage'], grade['letter']))
+
+    def get_grade(self, course_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT current_score, letter FROM grades WHERE course_id = ?', (course_id,)).fetchone()
+        return {'percentage': row['current_score'], 'letter': row['letter']} if row else None
+
+    def sync_assignments(self, course_id: int, assignments: List[Dict]) -> List[int]:
+        """Upsert a course's assignments and drop deleted ones.
+
+        Only rows whose updated_at changed are rewritten; their ids are returned.
+        """
+        with self._lock, self._conn:
+            known = {row['id']: row['updated_at'] for row in self._conn.execute(
+                'SELECT id, updated_at FROM assignments WHERE course_id = ?', (course_id,))}
+            # Copies, so bodies the transport keeps for 304 replies stay intact
+            changed = [_as_dict(a) for a in assignments
+                       if known.get(a['id'], object()) != a.get('updated_at')]
+            for assignment in changed:
+                # Submissions are tracked in their own table; a record without
+                # one (not requested) leaves the stored submission alone
+                submission = assignment.pop('submission', None)
+                if submission and any(value is not None for value in submission.values()):
+                    self._upsert_submission(course_id, assignment['id'], submission)
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO assignments '
+                '(id, course_id, due_at, due_ts, points_possible, updated_at, data) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(a['id'], course_id, a.get('due_at'), _timestamp(a.get('due_at')),
+                  a.get('points_possible'), a.get('updated_at'), json.dumps(a))
+                 for a in changed])
+            gone = set(known) - {a['id'] for a in assignments}
+            for assignment_id in gone:
+                self._conn.execute('DELETE FROM assignments WHERE id = ?', (assignment_id,))
+                self._conn.execute('DELETE FROM submissions WHERE assignment_id = ?', (assignment_id,))
+        return [a['id'] for a in changed]
+
+    def _upsert_submission(self, course_id: int, assignment_id: int, submission: Dict):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO submissions '
+            '(assignment_id, course_id, workflow_state, submitted_at, data) VALUES (?, ?, ?, ?, ?)',
+            (assignment_id, course_id, submission.get('workflow_state'),
+             submission.get('submitted_at'), json.dumps(submission)))
+
+    def upsert_submissions(self, course_id: int, submissions: List[Dict]):
+        with self._lock, self._conn:
+            for submission in submissions:
+                self._upsert_submission(course_id, submission['assignment_id'], submission)
+
+    def _assignment_rows(self, where: str = '', params: tuple = (), order: str = 'a.due_at') -> List[Dict]:
+        """Assignments shaped like the Canvas API (submission included) plus course info"""
+        query = (
+            'SELECT a.data AS data, a.course_id AS course_id, c.name AS course_name, '
+            's.data AS submission '
+            'FROM assignments a '
+            'LEFT JOIN courses c ON c.id = a.course_id '
+            'LEFT JOIN submissions s ON s.assignment_id = a.id '
+            f'{where} ORDER BY {order}'
+        )
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        assignments = []
+        for row in rows:
+            assignment = json.loads(row['data'])
+            assignment['submission'] = json.loads(row['submission']) if row['submission'] else {}
+            assignment['course_id'] = row['course_id']
+            assignment['course_name'] = row['course_name']
+            assignments.append(assignment)
+        return assignments
+
+    def get_assignments(self, course_id: Optional[int] = None) -> List[Dict]:
+        """All stored assignments, optionally for one course"""
+        if course_id is None:
+            return self._assignment_rows(order='c.position, a.due_ts')
+        return self._assignment_rows('WHERE a.course_id = ?', (course_id,), order='a.due_ts')
+
+    def get_assignments_due_between(self, start: datetime, end: datetime,
+                                    course_id: Optional[int] = None) -> List[Dict]:
+        """Assignments due in [start, end), soonest first, via the due-date index"""
+        where = 'WHERE a.due_ts >= ? AND a.due_ts < ?'
+        params = (_timestamp(start), _timestamp(end))
+        if course_id is not None:
+            where += ' AND a.course_id = ?'
+            params += (course_id,)
+        return self._assignment_rows(where, params, order='a.due_ts')
+
+    def get_upcoming_assignments(self, course_id: int, now: Optional[datetime] = None,
+                                 limit: Optional[int] = None) -> List[Dict]:
+        """A course's assignments due from now on, soonest first"""
+        where = 'WHERE a.course_id = ? AND a.due_ts >= ?'
+        params = (course_id, _timestamp(now or datetime.now()))
+        order = 'a.due_ts'
+        if limit is not None:
+            order += ' LIMIT ?'
+            params += (limit,)
+        return self._assignment_rows(where, params, order=order)
+
+
+def _as_dict(item) -> Dict:
+    """A plain copy of a Canvas dict or canvas_records record, ready for json.dumps"""
+    return item.to_dict() if hasattr(item, 'to_dict') else dict(item)
+
+
+def _timestamp(value) -> Optional[int]:
+    """Epoch seconds for a Canvas ISO timestamp or a datetime (naive means local time)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return int(value.timestamp())
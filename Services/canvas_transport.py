@@ -0,0 +1,229 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    CANVAS_BACKOFF_BASE,
+    CANVAS_BACKOFF_MAX,
+    CANVAS_MAX_RETRIES,
+    CANVAS_POOL_SIZE,
+    CANVAS_RATE_LIMIT_FLOOR,
+    CANVAS_TIMEOUT,
+)
+from Services.cache import shared_cache
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Large assignment lists decode faster with orjson or msgspec;
+# either is optional and the stdlib decoder is used when neither is installed
+try:
+    import orjson
+    decode_json = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+        decode_json = msgspec.json.Decoder().decode
+    except ImportError:
+        def decode_json(content):
+            return json.loads(content)
+
+_session = None
+_session_lock = threading.Lock()
+_prefetch_pool = None
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive session used for Canvas calls"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=CANVAS_POOL_SIZE,
+                                      pool_maxsize=CANVAS_POOL_SIZE,
+                                      max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def get_prefetch_pool() -> ThreadPoolExecutor:
+    """Return the shared pool that downloads the next page of paginated lists"""
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        with _session_lock:
+            if _prefetch_pool is None:
+                _prefetch_pool = ThreadPoolExecutor(max_workers=CANVAS_POOL_SIZE,
+                                                    thread_name_prefix='canvas-prefetch')
+    return _prefetch_pool
+
+
+class CanvasTransport:
+    """All HTTP traffic to the Canvas REST API goes through here.
+
+    Requests share one pooled session, carry a timeout, and are retried with
+    jittered exponential backoff when Canvas throttles or fails transiently.
+    GETs are conditional: a 304 reuses the body stored with its validators.
+    """
+
+    def __init__(self, canvas_url: str, api_token: str, cache=None):
+        self.canvas_url = canvas_url
+        self.headers = {"Authorization": f"Bearer {api_token}"}
+        self.timeout = CANVAS_TIMEOUT
+        self.max_retries = CANVAS_MAX_RETRIES
+        self.cache = cache or shared_cache
+        # Validators are per token, since Canvas responses are per user
+        self._cache_namespace = hashlib.sha256(
+            f"{canvas_url}:{api_token}".encode()).hexdigest()[:16]
+
+    def _url(self, path: str) -> str:
+        if path.startswith('http'):
+            return path
+        return f"{self.canvas_url}{path}"
+
+    def _is_throttled(self, response: requests.Response) -> bool:
+        """Canvas signals throttling with 403 "Rate Limit Exceeded" as well as 429"""
+        if response.status_code in RETRY_STATUSES:
+            return True
+        return response.status_code == 403 and 'Rate Limit Exceeded' in response.text
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before the next attempt, honoring Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(float(retry_after), CANVAS_BACKOFF_MAX)
+                except ValueError:
+                    pass
+        delay = min(CANVAS_BACKOFF_BASE * (2 ** attempt), CANVAS_BACKOFF_MAX)
+        return random.uniform(0, delay)
+
+    def _respect_quota(self, response: requests.Response):
+        """Slow down while Canvas reports the rate-limit bucket is nearly empty"""
+        remaining = response.headers.get('X-Rate-Limit-Remaining')
+        if remaining is None:
+            return
+        try:
+            remaining = float(remaining)
+        except ValueError:
+            return
+        if remaining < CANVAS_RATE_LIMIT_FLOOR:
+            shortfall = 1 - max(remaining, 0) / CANVAS_RATE_LIMIT_FLOOR
+            time.sleep(CANVAS_BACKOFF_BASE * shortfall)
+
+    def request(self, method: str, path: str, params: Optional[Dict] = None,
+                json: Optional[Dict] = None, headers: Optional[Dict] = None) -> requests.Response:
+        """Send a request, retrying throttled and transient failures"""
+        url = self._url(path)
+        request_headers = dict(self.headers, **(headers or {}))
+        session = get_session()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = session.request(method, url, params=params, json=json,
+                                           headers=request_headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if self._is_throttled(response) and attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, response))
+                continue
+
+            self._respect_quota(response)
+            response.raise_for_status()
+            return response
+
+    def get(self, path: str, params: Optional[Dict] = None) -> requests.Response:
+        return self.request('GET', path, params=params)
+
+    def _validator_key(self, url: str, params: Optional[Dict],
+                       transform: Optional[Callable] = None) -> str:
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        shape = getattr(transform, '__qualname__', 'json')
+        return f"{self._cache_namespace}:http:{shape}:{url}?{query}"
+
+    def conditional_get(self, path: str, params: Optional[Dict] = None,
+                        transform: Optional[Callable] = None) -> Tuple[Any, Optional[str]]:
+        """GET with If-None-Match/If-Modified-Since; returns (decoded body, next page URL).
+
+        Bodies that came with an ETag or Last-Modified are stored next to
+        them. When Canvas answers 304 the stored body is returned as is and
+        its entry re-armed, so nothing is downloaded or decoded again.
+        `transform` (e.g. canvas_records.assignments_from_canvas) is applied
+        to the decoded body, and its result is what gets stored.
+        """
+        key = self._validator_key(self._url(path), params, transform)
+        stored = self.cache.get(key, 'validators', default=None)
+        headers = {}
+        if stored is not None:
+            if stored['etag']:
+                headers['If-None-Match'] = stored['etag']
+            if stored['last_modified']:
+                headers['If-Modified-Since'] = stored['last_modified']
+
+        response = self.request('GET', path, params=params, headers=headers)
+        if response.status_code == 304 and stored is not None:
+            self.cache.set(key, stored, 'validators')
+            return stored['body'], stored['next']
+
+        body = decode_json(response.content)
+        if transform is not None:
+            body = transform(body)
+        next_url = response.links.get('next', {}).get('url')
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self.cache.set(key, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'body': body,
+                'next': next_url
+            }, 'validators')
+        return body, next_url
+
+    def get_json(self, path: str, params: Optional[Dict] = None):
+        """GET a Canvas endpoint and return the decoded JSON body"""
+        return self.conditional_get(path, params=params)[0]
+
+    def graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """POST a query to /api/graphql and return its data, raising on GraphQL errors"""
+        body = decode_json(self.request('POST', '/api/graphql',
+                                        json={'query': query, 'variables': variables or {}}).content)
+        if body.get('errors'):
+            raise requests.exceptions.RequestException(f"GraphQL errors: {body['errors']}")
+        return body.get('data') or {}
+
+    def iter_pages(self, path: str, params: Optional[Dict] = None,
+                   transform: Optional[Callable] = None) -> Iterator[List]:
+        """Yield each page of a list endpoint by following Link: rel="next".
+
+        The next page is requested in the background while the caller works
+        through the current one. Closing the generator early cancels the
+        prefetch, so nothing past the last consumed page is waited on.
+        """
+        body, next_url = self.conditional_get(path, params=params, transform=transform)
+        while True:
+            pending = (get_prefetch_pool().submit(self.conditional_get, next_url, transform=transform)
+                       if next_url else None)
+            try:
+                yield body
+            except GeneratorExit:
+                if pending is not None:
+                    pending.cancel()
+                raise
+            if pending is None:
+                return
+            body, next_url = pending.result()
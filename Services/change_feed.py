@@ -0,0 +1,81 @@
+import json
+import queue
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config.settings import EVENTS_HEARTBEAT, EVENTS_HISTORY
+
+
+class ChangeFeed:
+    """In-process publish/subscribe channel behind the /api/events SSE stream.
+
+    Background workers publish what changed; every open tab is a subscriber
+    with its own queue. The last `history` events are kept so a client that
+    reconnects with Last-Event-ID gets what it missed.
+    """
+
+    def __init__(self, history: int = EVENTS_HISTORY):
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._history = deque(maxlen=history)
+        self._subscribers: List[queue.Queue] = []
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    def publish(self, event_type: str, data) -> int:
+        with self._lock:
+            event = {'id': self._next_id, 'type': event_type, 'data': data}
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"Change listener failed: {e}")
+        for subscriber in subscribers:
+            subscriber.put(event)
+        return event['id']
+
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """Call listener(event) in the publishing thread for every event"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def subscribe(self, last_id: Optional[int] = None) -> queue.Queue:
+        """A queue receiving every new event, pre-filled with those after last_id"""
+        subscriber = queue.Queue()
+        with self._lock:
+            if last_id is not None:
+                for event in self._history:
+                    if event['id'] > last_id:
+                        subscriber.put(event)
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def stream(self, last_id: Optional[int] = None,
+               heartbeat: float = EVENTS_HEARTBEAT) -> Iterator[str]:
+        """Server-Sent Events text for one client; runs until the client disconnects"""
+        subscriber = self.subscribe(last_id)
+        try:
+            # Tell EventSource to wait a while before reconnecting after errors
+            yield 'retry: 10000\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Comment lines keep proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+
+shared_feed = ChangeFeed()
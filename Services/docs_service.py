@@ -261,7 +261,7 @@ class DocsService:
                     return {"error": "Could not get student name from Canvas"}
 
             # If we have specific assignment details from the request
-            if hasattr(canvas_service, 'current_assignment'):
+            if canvas_service.current_assignment is not None:
                 assignment = canvas_service.current_assignment
                 course = canvas_service.current_course
                 
@@ -0,0 +1,53 @@
+from flask_caching.backends.base import BaseCache
+
+from Services.cache import shared_cache, MISSING
+
+# flask_caching uses a timeout of 0 for "never expires"
+NO_EXPIRY = 10 * 365 * 24 * 3600
+
+
+class SharedCacheBackend(BaseCache):
+    """flask_caching backend that stores @cache.cached pages in shared_cache.
+
+    Enable it with CACHE_TYPE = 'Services.flask_cache.SharedCacheBackend'.
+    """
+
+    resource = 'pages'
+
+    def __init__(self, backend=None, default_timeout: int = 300):
+        super().__init__(default_timeout=default_timeout)
+        self.backend = backend or shared_cache
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        return cls(default_timeout=kwargs.get('default_timeout', 300))
+
+    prefix = 'flask:'
+
+    def _key(self, key):
+        return f"{self.prefix}{key}"
+
+    def get(self, key):
+        return self.backend.get(self._key(key), self.resource, default=None)
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout) or NO_EXPIRY
+        self.backend.set(self._key(key), value, self.resource, ttl=timeout)
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key):
+        self.backend.delete(self._key(key))
+        return True
+
+    def has(self, key):
+        return self.backend.get(self._key(key), self.resource) is not MISSING
+
+    def clear(self):
+        # Only the pages; the backend is shared with Canvas data and AI results
+        self.backend.clear(self.prefix)
+        return True
@@ -0,0 +1,125 @@
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import GRADE_CREDITS_PER_COURSE
+
+
+class GradeScale:
+    """Percentage cutoffs mapped to letters and grade points.
+
+    `cutoffs` are the ascending minimum percentages of every grade above the
+    lowest one; lookups are a bisect over them instead of an if/elif ladder.
+    """
+
+    def __init__(self, cutoffs: Sequence[float], letters: Sequence[str], points: Sequence[float]):
+        if not (len(letters) == len(points) == len(cutoffs) + 1):
+            raise ValueError("A grade scale needs one more letter and point value than cutoffs")
+        if list(cutoffs) != sorted(cutoffs):
+            raise ValueError("Grade scale cutoffs must be ascending")
+        self.cutoffs = tuple(cutoffs)
+        self.letters = tuple(letters)
+        self.points = tuple(points)
+
+    def _index(self, percentage: float) -> int:
+        return bisect_right(self.cutoffs, percentage)
+
+    def letter(self, percentage: Optional[float]) -> str:
+        if percentage is None:
+            return 'N/A'
+        return self.letters[self._index(percentage)]
+
+    def grade_points(self, percentage: Optional[float]) -> Optional[float]:
+        if percentage is None:
+            return None
+        return self.points[self._index(percentage)]
+
+    def classify(self, percentages: Iterable[Optional[float]]) -> List[Tuple[str, Optional[float]]]:
+        """(letter, points) for every percentage in one call"""
+        results = []
+        for percentage in percentages:
+            if percentage is None:
+                results.append(('N/A', None))
+            else:
+                index = self._index(percentage)
+                results.append((self.letters[index], self.points[index]))
+        return results
+
+    @property
+    def passing(self) -> float:
+        """Lowest percentage worth any grade points"""
+        return self.cutoffs[0]
+
+
+DEFAULT_SCALE = GradeScale(
+    cutoffs=(60, 63, 67, 70, 73, 77, 80, 83, 87, 90, 93),
+    letters=('F', 'D-', 'D', 'D+', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A'),
+    points=(0.0, 0.7, 1.0, 1.3, 1.7, 2.0, 2.3, 2.7, 3.0, 3.3, 3.7, 4.0)
+)
+
+# Minimum earned credits for each class standing, highest first
+STANDINGS = ((90, 'Senior'), (60, 'Junior'), (30, 'Sophomore'), (0, 'Freshman'))
+
+
+def _gpa(points: float, credits: float) -> Optional[float]:
+    return round(points / credits, 2) if credits > 0 else None
+
+
+def summarize(enrollments: Iterable[Dict], scale: GradeScale = DEFAULT_SCALE,
+              credits: Optional[Dict[int, float]] = None) -> Dict:
+    """GPA, per-term GPA and credit totals over a batch of enrollments in one pass.
+
+    Each enrollment is a dict with 'course_id', 'percentage' (None when
+    ungraded) and optionally 'term'. `credits` maps course ids to their
+    credit hours; others count GRADE_CREDITS_PER_COURSE.
+
+    Returns {'gpa', 'graded_credits', 'earned_credits', 'terms':
+    {term: {'gpa', 'credits'}}, 'courses': {course_id: {'letter', 'points'}}}.
+    """
+    credits = credits or {}
+    total_points = 0.0
+    graded_credits = 0.0
+    earned_credits = 0.0
+    terms: Dict[Optional[str], List[float]] = {}
+    courses = {}
+
+    for enrollment in enrollments:
+        percentage = enrollment.get('percentage')
+        course_id = enrollment.get('course_id')
+        if percentage is None:
+            courses[course_id] = {'letter': 'N/A', 'points': None}
+            continue
+        index = scale._index(percentage)
+        points = scale.points[index]
+        courses[course_id] = {'letter': scale.letters[index], 'points': points}
+
+        course_credits = credits.get(course_id, GRADE_CREDITS_PER_COURSE)
+        total_points += points * course_credits
+        graded_credits += course_credits
+        if percentage >= scale.passing:
+            earned_credits += course_credits
+        term = terms.setdefault(enrollment.get('term'), [0.0, 0.0])
+        term[0] += points * course_credits
+        term[1] += course_credits
+
+    return {
+        'gpa': _gpa(total_points, graded_credits),
+        'graded_credits': graded_credits,
+        'earned_credits': earned_credits,
+        'terms': {term: {'gpa': _gpa(points, term_credits), 'credits': term_credits}
+                  for term, (points, term_credits) in terms.items()},
+        'courses': courses
+    }
+
+
+def format_grade(grade: Optional[Dict]) -> str:
+    """How a course grade is shown in the UI, e.g. 91.5% (A-)"""
+    if not grade or grade.get('percentage') is None:
+        return 'N/A'
+    return f"{grade['percentage']:.1f}% ({grade['letter']})"
+
+
+def class_standing(earned_credits: float) -> str:
+    for minimum, standing in STANDINGS:
+        if earned_credits >= minimum:
+            return standing
+    return STANDINGS[-1][1]
@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+
+def summarize_assignment_groups(groups: List[Dict]) -> List[Dict]:
+    """Reduce Canvas assignment groups to what a projection needs.
+
+    Returns [{'weight': float, 'points': [...], 'scores': [...]}] where a
+    score of None marks work that has not been graded yet. Excused and
+    omitted assignments and ones worth no points are left out.
+    """
+    summary = []
+    for group in groups:
+        points = []
+        scores = []
+        for assignment in group.get('assignments') or []:
+            if assignment.get('omit_from_final_grade') or not assignment.get('points_possible'):
+                continue
+            submission = assignment.get('submission') or {}
+            if submission.get('excused'):
+                continue
+            points.append(float(assignment['points_possible']))
+            score = submission.get('score')
+            scores.append(None if score is None else float(score))
+        summary.append({'weight': float(group.get('group_weight') or 0), 'points': points, 'scores': scores})
+    return summary
+
+
+class GradeProjector:
+    """What-if final grades for every course at once.
+
+    A course's final percentage is linear in the score earned on the work
+    that is still ungraded: final = base + slope * remaining_score, where
+    base is what is already banked and slope is the share of the grade
+    still open. Both are worked out once from the submission matrix, so a
+    query is a few vector operations with no Canvas call.
+    """
+
+    def __init__(self, course_ids: List[int], base: np.ndarray, slope: np.ndarray,
+                 current: np.ndarray):
+        self.course_ids = list(course_ids)
+        self.base = base
+        self.slope = slope
+        self.current = current
+        self._position = {course_id: i for i, course_id in enumerate(self.course_ids)}
+
+    @classmethod
+    def from_assignment_groups(cls, groups_by_course: Dict[int, List[Dict]],
+                               weighted: Optional[Dict[int, bool]] = None) -> 'GradeProjector':
+        """Build from summarize_assignment_groups() output per course.
+
+        `weighted[course_id]` says whether the course applies assignment
+        group weights; otherwise every point counts the same.
+        """
+        weighted = weighted or {}
+        course_ids = list(groups_by_course)
+        base = np.full(len(course_ids), np.nan)
+        slope = np.zeros(len(course_ids))
+        current = np.full(len(course_ids), np.nan)
+
+        for i, course_id in enumerate(course_ids):
+            groups = groups_by_course[course_id]
+            # One row per assignment: its group, points possible and score
+            group_index = np.array([g for g, group in enumerate(groups) for _ in group['points']], dtype=int)
+            if group_index.size == 0:
+                continue
+            points = np.array([p for group in groups for p in group['points']])
+            scores = np.array([np.nan if s is None else s for group in groups for s in group['scores']])
+            graded = ~np.isnan(scores)
+
+            group_count = len(groups)
+            earned = np.bincount(group_index, weights=np.where(graded, scores, 0), minlength=group_count)
+            graded_points = np.bincount(group_index, weights=np.where(graded, points, 0), minlength=group_count)
+            total_points = np.bincount(group_index, weights=points, minlength=group_count)
+            remaining = total_points - graded_points
+
+            if weighted.get(course_id):
+                weights = np.array([group['weight'] for group in groups])
+            else:
+                # Unweighted courses: a group counts in proportion to its points
+                weights = total_points.copy()
+
+            counted = (total_points > 0) & (weights > 0)
+            if not counted.any():
+                continue
+            share = np.where(counted, weights, 0) / weights[counted].sum()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                base[i] = 100 * np.nansum(share * earned / total_points)
+                slope[i] = 100 * np.nansum(share * remaining / total_points)
+                # Like Canvas' current_score: only graded work, weights renormalized
+                has_graded = counted & (graded_points > 0)
+                if has_graded.any():
+                    graded_share = np.where(has_graded, weights, 0) / weights[has_graded].sum()
+                    current[i] = 100 * np.nansum(graded_share * earned / graded_points)
+
+        return cls(course_ids, base, slope, current)
+
+    def _values(self, values: np.ndarray) -> Dict[int, Optional[float]]:
+        return {course_id: None if np.isnan(value) else round(float(value), 2)
+                for course_id, value in zip(self.course_ids, values)}
+
+    def _per_course(self, value: Union[float, Dict[int, float]], default: float) -> np.ndarray:
+        if isinstance(value, dict):
+            return np.array([value.get(course_id, default) for course_id in self.course_ids], dtype=float)
+        return np.full(len(self.course_ids), float(value))
+
+    def project(self, remaining_score: Union[float, Dict[int, float]]) -> Dict[int, Optional[float]]:
+        """Final percentage per course if the ungraded work scores `remaining_score` percent.
+
+        Pass a number for every course or a {course_id: percent} dict.
+        """
+        scores = self._per_course(remaining_score, 100.0)
+        return self._values(self.base + self.slope * scores / 100)
+
+    def best_case(self) -> Dict[int, Optional[float]]:
+        return self._values(self.base + self.slope)
+
+    def worst_case(self) -> Dict[int, Optional[float]]:
+        return self._values(self.base)
+
+    def required(self, target: Union[float, Dict[int, float]]) -> Dict[int, Optional[float]]:
+        """Percent needed on the remaining work to finish at `target` percent.
+
+        Values above 100 are out of reach; None means nothing is left to
+        grade (or the course has no graded structure).
+        """
+        targets = self._per_course(target, 90.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            needed = np.where(self.slope > 0, 100 * (targets - self.base) / self.slope, np.nan)
+        return self._values(np.maximum(needed, 0))
+
+    def current_scores(self) -> Dict[int, Optional[float]]:
+        return self._values(self.current)
@@ -1,16 +1,35 @@
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 import os.path
-import base64
+import html
+import random
+import threading
+import time
+from email.utils import parseaddr, parsedate_to_datetime
 from typing import List, Dict, Optional
 from os import getenv
 from dotenv import load_dotenv
 from pathlib import Path
+from config.settings import (GMAIL_BACKOFF_BASE, GMAIL_BATCH_SIZE, GMAIL_MAX_RETRIES,
+                             INBOX_BODY_CACHE_ENTRIES, INBOX_POLL_INTERVAL, INBOX_SYNC_LIMIT)
+from Services.cache import MemoryCache
+from Services import mime_text
+from Services.change_feed import shared_feed
+from Services.inbox_store import InboxStore
 
 class InboxService:
     GMAIL_SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
+    # All the inbox list shows; bodies are fetched per message when opened
+    LIST_HEADERS = ['Subject', 'From', 'Date']
+    # Batch items failing with these are sent again after a backoff
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # New mail found by any sync, page load or watcher, is pushed to open pages
+    feed = shared_feed
 
     def __init__(self):
         # Load .env file from project root
@@ -25,6 +44,8 @@ class InboxService:
         print(f"Loaded allowed senders: {self.allowed_senders}")
         
         # Gmail setup
+        self.gmail_credentials = None
+        self._local = threading.local()
         self.gmail_credentials_path = getenv('CREDENTIALS_PATH')
         print(f"Loaded credentials path: {self.gmail_credentials_path}")
         
@@ -38,6 +59,8 @@ class InboxService:
         # Outlook setup
         self.outlook_service = None
 
+        self.store = get_inbox_store()
+
         if not self.gmail_service:
             raise ValueError("No email service credentials provided")
 
@@ -74,34 +97,39 @@ class InboxService:
             except Exception:
                 pass
 
+        self.gmail_credentials = creds
         return build('gmail', 'v1', credentials=creds)
 
+    def _http(self):
+        """Authorized connection for the calling thread; httplib2 is not thread-safe"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._local.http = AuthorizedHttp(self.gmail_credentials, http=httplib2.Http())
+        return http
+
     def get_emails_from_sender(self, sender_email: str, page: int = 1, per_page: int = 20) -> Dict:
-        """Get paginated emails from sender"""
-        try:
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            all_emails = []
+        """Get one page of emails from a sender, or from every allowed sender with "all"
 
+        The local inbox store is brought up to date first, then paged.
+        """
+        try:
             if sender_email == "all":
-                for sender in self.allowed_senders:
-                    if self.gmail_service:
-                        gmail_emails = self._get_gmail_emails(sender, per_page)
-                        all_emails.extend(gmail_emails)
+                senders = self.allowed_senders
             elif sender_email in self.allowed_senders:
-                if self.gmail_service:
-                    gmail_emails = self._get_gmail_emails(sender_email, per_page)
-                    all_emails.extend(gmail_emails)
+                senders = [sender_email]
             else:
                 raise ValueError(f"Invalid or unauthorized sender: {sender_email}")
 
-            # Sort and paginate
-            all_emails.sort(key=lambda x: int(x['timestamp']), reverse=True)
-            total_emails = len(all_emails)
-            paginated_emails = all_emails[start_idx:end_idx]
-            
+            if self.gmail_service:
+                try:
+                    self.sync_inbox()
+                except Exception as e:
+                    # Still show what was synced before
+                    print(f"Error syncing inbox: {str(e)}")
+            emails, total_emails = self.store.get_page(senders, page, per_page)
+
             return {
-                'emails': paginated_emails,
+                'emails': emails,
                 'total': total_emails,
                 'page': page,
                 'per_page': per_page,
@@ -118,78 +146,221 @@ class InboxService:
                 'total_pages': 0
             }
 
-    def _get_gmail_emails(self, sender_email: str, max_results: int) -> List[Dict]:
-        try:
-            query = f"from:{sender_email}"
+    def sync_inbox(self) -> List[Dict]:
+        """Bring the local store up to date with Gmail; returns the emails added.
+
+        The first run downloads the newest INBOX_SYNC_LIMIT messages from the
+        allowed senders. Later runs replay history().list from the stored
+        historyId, so only new mail is transferred, and publish it as an
+        'emails' event. A full download (also done when the allowed senders
+        change or Gmail no longer has our history position) returns [].
+        """
+        if not self.allowed_senders:
+            return []
+        query = self._sender_query(self.allowed_senders)
+        with _sync_lock:
+            history_id = self.store.get_state('history_id')
+            if history_id is not None and self.store.get_state('query') == query:
+                try:
+                    new_emails = self._sync_history(history_id)
+                except HttpError as e:
+                    # 404 means the start position is too old to replay
+                    if e.resp.status != 404:
+                        raise
+                    print("Gmail history position expired, resyncing the inbox")
+                else:
+                    if new_emails:
+                        self.feed.publish('emails', {'emails': new_emails})
+                    return new_emails
+            self._sync_full(query)
+            return []
+
+    def _sync_full(self, query: str):
+        http = self._http()
+        # Read the position first so mail arriving during the download is replayed later
+        history_id = self.gmail_service.users().getProfile(userId='me').execute(http=http)['historyId']
+        message_ids = []
+        page_token = None
+        while len(message_ids) < INBOX_SYNC_LIMIT:
             results = self.gmail_service.users().messages().list(
                 userId='me',
                 q=query,
-                maxResults=max_results
-            ).execute()
-            
-            messages = results.get('messages', [])
-            if not messages:
-                return []
-            
-            emails = []
-            for message in messages:
-                try:
-                    msg = self.gmail_service.users().messages().get(
-                        userId='me',
-                        id=message['id'],
-                        format='full'
-                    ).execute()
-                    
-                    headers = msg['payload']['headers']
-                    subject = next(
-                        (header['value'] for header in headers if header['name'].lower() == 'subject'),
-                        'No Subject'
-                    )
-                    
-                    text = self._extract_gmail_body(msg['payload']) or 'No content available'
-                    
-                    emails.append({
-                        'id': message['id'],
-                        'subject': subject,
-                        'body': text,
-                        'timestamp': msg['internalDate'],
-                        'source': 'Gmail',
-                        'sender': sender_email
-                    })
-                except Exception:
-                    continue
-            
-            return emails
-            
-        except Exception:
-            return []
+                maxResults=min(500, INBOX_SYNC_LIMIT - len(message_ids)),
+                pageToken=page_token
+            ).execute(http=http)
+            message_ids.extend(m['id'] for m in results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
 
-    def _extract_gmail_body(self, payload):
-        def get_body_from_part(part):
-            if part.get('body', {}).get('data'):
-                try:
-                    data = part['body']['data']
-                    padded_data = data + ('=' * (4 - len(data) % 4))
-                    decoded = base64.urlsafe_b64decode(padded_data)
-                    return decoded.decode('utf-8', errors='replace')
-                except Exception:
-                    return None
-            return None
+        # Gmail's from: search is looser than an address match, so filter here too
+        emails = self._allowed_emails(self._get_gmail_metadata(message_ids, http))
+        self.store.clear()
+        self.store.upsert_messages(emails)
+        self.store.set_state('query', query)
+        self.store.set_state('history_id', str(history_id))
 
-        if 'parts' in payload:
-            text_content = []
-            for part in payload['parts']:
-                if part.get('mimeType') == 'text/plain':
-                    content = get_body_from_part(part)
-                    if content:
-                        text_content.append(content)
-                elif 'parts' in part:
-                    nested_content = self._extract_gmail_body(part)
-                    if nested_content:
-                        text_content.append(nested_content)
-            return '\n'.join(filter(None, text_content))
-        else:
-            return get_body_from_part(payload)
+    def _sync_history(self, history_id: str) -> List[Dict]:
+        http = self._http()
+        added, deleted = [], set()
+        page_token = None
+        while True:
+            results = self.gmail_service.users().history().list(
+                userId='me',
+                startHistoryId=history_id,
+                historyTypes=['messageAdded', 'messageDeleted'],
+                pageToken=page_token
+            ).execute(http=http)
+            for record in results.get('history', []):
+                added.extend(item['message']['id'] for item in record.get('messagesAdded', []))
+                deleted.update(item['message']['id'] for item in record.get('messagesDeleted', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        new_ids = [i for i in dict.fromkeys(added) if i not in deleted]
+        known = self.store.known_ids(new_ids)
+        new_ids = [i for i in new_ids if i not in known]
+
+        emails = []
+        if new_ids:
+            # History covers the whole mailbox; keep only mail from the allowed senders
+            emails = self._allowed_emails(self._get_gmail_metadata(new_ids, http))
+            self.store.upsert_messages(emails)
+        if deleted:
+            self.store.delete_messages(list(deleted))
+        self.store.set_state('history_id', str(results['historyId']))
+        emails.sort(key=lambda x: int(x['timestamp']), reverse=True)
+        return emails
+
+    @staticmethod
+    def _sender_query(senders: List[str]) -> str:
+        # One search for every sender instead of a list call each
+        if len(senders) == 1:
+            return f"from:{senders[0]}"
+        return f"from:({' OR '.join(senders)})"
+
+    @staticmethod
+    def _header(msg: Dict, name: str, default: str) -> str:
+        return next(
+            (header['value'] for header in msg['payload'].get('headers', [])
+             if header['name'].lower() == name),
+            default
+        )
+
+    def _get_gmail_metadata(self, message_ids: List[str], http=None) -> List[Dict]:
+        return self._get_gmail_messages(message_ids, http, format='metadata',
+                                        metadataHeaders=self.LIST_HEADERS)
+
+    def _allowed_emails(self, messages: List[Dict]) -> List[Dict]:
+        """List entries for the messages whose From address is an allowed sender.
+
+        This decides what enters the store, and the store decides which
+        bodies /api/inbox/messages/<id> will serve.
+        """
+        return [email for email in self._to_emails(messages, self.allowed_senders)
+                if email['sender'] in self.allowed_senders]
+
+    def _to_emails(self, messages: List[Dict], senders: List[str]) -> List[Dict]:
+        """List entries from metadata-format messages"""
+        emails = []
+        for msg in messages:
+            try:
+                timestamp = msg.get('internalDate')
+                if timestamp is None:
+                    timestamp = int(parsedate_to_datetime(self._header(msg, 'date', '')).timestamp() * 1000)
+
+                emails.append({
+                    'id': msg['id'],
+                    'subject': self._header(msg, 'subject', 'No Subject'),
+                    # Gmail's snippet is HTML-escaped plain text
+                    'snippet': mime_text.snippet(html.unescape(msg.get('snippet', ''))),
+                    'timestamp': timestamp,
+                    'source': 'Gmail',
+                    'sender': self._match_sender(self._header(msg, 'from', ''), senders)
+                })
+            except Exception:
+                continue
+        return emails
+
+    def get_message_body(self, message_id: str) -> Optional[str]:
+        """Plain-text body of one message, fetched on first use and kept in a bounded LRU"""
+        body = _body_cache.get(message_id, resource='inbox_body', default=None)
+        if body is not None:
+            return body
+        try:
+            msg = self.gmail_service.users().messages().get(
+                userId='me', id=message_id, format='full'
+            ).execute(http=self._http())
+        except HttpError as e:
+            if e.resp.status == 404:
+                return None
+            raise
+        body = self._extract_gmail_body(msg['payload']) or 'No content available'
+        _body_cache.set(message_id, body, resource='inbox_body')
+        return body
+
+    @staticmethod
+    def _match_sender(from_header: str, senders: List[str]) -> str:
+        """The allowed sender whose address is exactly the From address, else that address.
+
+        Display names and look-alike addresses (jimbob@ for bob@) never match.
+        """
+        address = parseaddr(from_header)[1].lower()
+        for sender in senders:
+            if sender.lower() == address:
+                return sender
+        return address
+
+    def _get_gmail_messages(self, message_ids: List[str], http=None, **params) -> List[Dict]:
+        """Fetch messages through Gmail's batch endpoint, GMAIL_BATCH_SIZE per round trip.
+
+        Returned in the order of message_ids; messages deleted since they were
+        listed are skipped. Items Gmail rate-limits or fails are sent again
+        with backoff, GMAIL_MAX_RETRIES times. After that, or on any other
+        error, the HttpError is raised so a sync never moves its history
+        position past mail it didn't get.
+        """
+        params.setdefault('format', 'full')
+        http = http or self._http()
+        fetched = {}
+        failed = {}
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                fetched[request_id] = response
+            elif not (isinstance(exception, HttpError) and exception.resp.status == 404):
+                failed[request_id] = exception
+
+        pending = list(message_ids)
+        for attempt in range(GMAIL_MAX_RETRIES + 1):
+            failed.clear()
+            for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+                batch = self.gmail_service.new_batch_http_request(callback=collect)
+                for message_id in pending[start:start + GMAIL_BATCH_SIZE]:
+                    batch.add(self.gmail_service.users().messages().get(userId='me', id=message_id, **params),
+                              request_id=message_id)
+                batch.execute(http=http)
+            if not failed:
+                break
+            fatal = next((e for e in failed.values() if not self._is_retryable(e)), None)
+            if fatal is not None or attempt == GMAIL_MAX_RETRIES:
+                raise fatal or next(iter(failed.values()))
+            print(f"Retrying {len(failed)} Gmail messages: {next(iter(failed.values()))}")
+            time.sleep(random.uniform(0, GMAIL_BACKOFF_BASE * 2 ** attempt))
+            pending = list(failed)
+        return [fetched[message_id] for message_id in message_ids if message_id in fetched]
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Per-user rate limits come back as 429, or 403 with a rateLimitExceeded reason"""
+        if not isinstance(error, HttpError):
+            return False
+        if error.resp.status in self.RETRY_STATUSES:
+            return True
+        return error.resp.status == 403 and b'ateLimitExceeded' in (error.content or b'')
+
+    def _extract_gmail_body(self, payload):
+        return mime_text.extract_text(payload)
 
     def verify_credentials(self) -> Dict[str, bool]:
         """Verify that the email service credentials are valid"""
@@ -220,4 +391,75 @@ class InboxService:
             return len(messages) > 0
         except Exception as e:
             print(f"Error testing sender {sender_email}: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+class InboxWatcher:
+    """Syncs the inbox on a daemon thread so new mail reaches open pages.
+
+    Each pass is an incremental sync_inbox(), which publishes what it adds
+    as an 'emails' event.
+    """
+
+    def __init__(self, interval: int = INBOX_POLL_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='inbox-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        try:
+            inbox_service = InboxService()
+        except Exception as e:
+            print(f"Inbox watcher not started: {e}")
+            return
+        while not self._stop.is_set():
+            try:
+                self.poll_once(inbox_service)
+            except Exception as e:
+                print(f"Inbox poll failed: {e}")
+            self._stop.wait(self.interval)
+
+    def poll_once(self, inbox_service: InboxService) -> List[Dict]:
+        """Check for new mail once; returns the emails that were published"""
+        return inbox_service.sync_inbox()
+
+
+_watcher: Optional[InboxWatcher] = None
+_watcher_lock = threading.Lock()
+_store: Optional[InboxStore] = None
+# Opened message bodies, least recently used dropped first; entries also expire after a day
+_body_cache = MemoryCache(max_entries=INBOX_BODY_CACHE_ENTRIES, default_ttl=86400)
+# Page loads and the watcher sync the same store; one sync at a time
+_sync_lock = threading.Lock()
+
+
+def get_inbox_store() -> InboxStore:
+    """Return the process-wide local inbox store"""
+    global _store
+    if _store is None:
+        with _watcher_lock:
+            if _store is None:
+                _store = InboxStore()
+    return _store
+
+
+def start_inbox_watcher() -> Optional[InboxWatcher]:
+    """Start the process-wide inbox watcher; does nothing when INBOX_POLL_INTERVAL is 0"""
+    global _watcher
+    if _watcher is not None or INBOX_POLL_INTERVAL <= 0:
+        return _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = InboxWatcher()
+            _watcher.start()
+    return _watcher
@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import INBOX_STORE_PATH
+
+
+class InboxStore:
+    """Local SQLite copy of the mail from the allowed senders.
+
+    Filled by InboxService.sync_inbox: one full download, then only the
+    changes Gmail's history API reports. The inbox pages are read from here.
+    Only list fields (subject, sender, date, snippet) are kept; bodies are
+    fetched when a message is opened.
+    """
+
+    def __init__(self, path: str = INBOX_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS messages (
+                    id TEXT PRIMARY KEY,
+                    sender TEXT NOT NULL,
+                    subject TEXT,
+                    snippet TEXT,
+                    timestamp INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS messages_timestamp ON messages (timestamp);
+                CREATE INDEX IF NOT EXISTS messages_sender_timestamp ON messages (sender, timestamp);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            ''')
+
+    def get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_state(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, value))
+
+    def clear(self):
+        """Drop every message and the sync position, e.g. before a full resync"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM messages')
+            self._conn.execute('DELETE FROM sync_state')
+
+    def known_ids(self, message_ids: List[str]) -> set:
+        """Which of message_ids are already stored"""
+        if not message_ids:
+            return set()
+        placeholders = ','.join('?' * len(message_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT id FROM messages WHERE id IN ({placeholders})', message_ids).fetchall()
+        return {row['id'] for row in rows}
+
+    def upsert_messages(self, emails: List[Dict]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO messages (id, sender, subject, snippet, timestamp) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(e['id'], e['sender'], e['subject'], e['snippet'], int(e['timestamp'])) for e in emails])
+
+    def delete_messages(self, message_ids: List[str]):
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM messages WHERE id = ?', [(i,) for i in message_ids])
+
+    def get_page(self, senders: List[str], page: int, per_page: int) -> Tuple[List[Dict], int]:
+        """(emails on the page, newest first, and the total) for the given senders"""
+        if not senders:
+            return [], 0
+        where = f"WHERE sender IN ({','.join('?' * len(senders))})"
+        params = tuple(senders)
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM messages {where}', params).fetchone()[0]
+            rows = self._conn.execute(
+                f'SELECT id, sender, subject, snippet, timestamp FROM messages {where} '
+                'ORDER BY timestamp DESC LIMIT ? OFFSET ?',
+                params + (per_page, (page - 1) * per_page)).fetchall()
+        return [_email(row) for row in rows], total
+
+
+def _email(row) -> Dict:
+    return {
+        'id': row['id'],
+        'subject': row['subject'],
+        'snippet': row['snippet'] or '',
+        'timestamp': str(row['timestamp']),
+        'source': 'Gmail',
+        'sender': row['sender']
+    }
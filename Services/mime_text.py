@@ -0,0 +1,165 @@
+import base64
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import INBOX_BODY_MAX_CHARS, INBOX_SNIPPET_CHARS
+
+# Base64 characters decoded per step; a multiple of 4 so every chunk stands alone
+CHUNK_CHARS = 16384
+# Deeper nesting than this is treated as malformed and not descended into
+MAX_DEPTH = 32
+TRUNCATED = '\n[Message truncated]'
+
+_CHARSET = re.compile(r'charset="?([\w.:-]+)"?', re.IGNORECASE)
+_SPACES = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n\s*\n+')
+
+
+def _charset(part: Dict) -> str:
+    for header in part.get('headers') or []:
+        if header['name'].lower() == 'content-type':
+            match = _CHARSET.search(header['value'])
+            if match:
+                try:
+                    return codecs.lookup(match.group(1)).name
+                except LookupError:
+                    break
+    return 'utf-8'
+
+
+def _decode_part(part: Dict, limit: int, out: List[str]) -> Tuple[int, bool]:
+    """Decode a part's base64url body into `out`, stopping after `limit` characters.
+
+    The base64 text is sliced CHUNK_CHARS at a time and only those slices are
+    encoded and decoded, so a long body is never copied past the prefix that
+    fits. Returns (characters written, whether the whole body fit).
+    """
+    if limit <= 0:
+        return 0, False
+    data = part['body']['data']
+    decoder = codecs.getincrementaldecoder(_charset(part))(errors='replace')
+    written = 0
+    for start in range(0, len(data), CHUNK_CHARS):
+        chunk = data[start:start + CHUNK_CHARS]
+        final = start + CHUNK_CHARS >= len(data)
+        if final and len(chunk) % 4:
+            # Gmail strips the padding
+            chunk += '=' * (4 - len(chunk) % 4)
+        text = decoder.decode(base64.urlsafe_b64decode(chunk), final=final)
+        if written + len(text) > limit:
+            out.append(text[:limit - written])
+            return limit, False
+        out.append(text)
+        written += len(text)
+        if written == limit and not final:
+            return written, False
+    return written, True
+
+
+def _text_parts(payload: Dict):
+    """(plain parts, first html part) in document order, walked without recursion"""
+    plain = []
+    html_part = None
+    stack = [(payload, 0)]
+    while stack:
+        part, depth = stack.pop()
+        parts = part.get('parts')
+        if parts:
+            if depth < MAX_DEPTH:
+                stack.extend((child, depth + 1) for child in reversed(parts))
+            continue
+        # Attachments, and bodies Gmail only returns by attachmentId, are skipped
+        if part.get('filename') or not (part.get('body') or {}).get('data'):
+            continue
+        mime_type = (part.get('mimeType') or '').lower()
+        if mime_type == 'text/plain':
+            plain.append(part)
+        elif mime_type == 'text/html' and html_part is None:
+            html_part = part
+    return plain, html_part
+
+
+class _HTMLText(HTMLParser):
+    BLOCKS = {'p', 'div', 'br', 'li', 'tr', 'table', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4',
+              'h5', 'h6', 'blockquote', 'pre', 'hr', 'section', 'article', 'header', 'footer'}
+    SKIP = {'script', 'style', 'head', 'title'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pieces: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skipping += 1
+        elif tag in self.BLOCKS:
+            self.pieces.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in self.BLOCKS:
+            self.pieces.append('\n')
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.pieces.append(data)
+
+
+def html_to_text(markup: str) -> str:
+    """Readable text from an HTML body: tags dropped, blocks on their own lines"""
+    parser = _HTMLText()
+    parser.feed(markup)
+    parser.close()
+    text = _SPACES.sub(' ', ''.join(parser.pieces))
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    return _BLANK_LINES.sub('\n\n', text).strip()
+
+
+def extract_text(payload: Dict, max_chars: int = INBOX_BODY_MAX_CHARS) -> Optional[str]:
+    """Plain text of a Gmail message payload, at most max_chars long.
+
+    text/plain parts are joined in order; when there are none the first
+    text/html part is converted. Decoding stops once the cap is reached and
+    a truncation note is appended. None when the message has no text.
+    """
+    plain, html_part = _text_parts(payload)
+    pieces: List[str] = []
+    written = 0
+    truncated = False
+    if plain:
+        for part in plain:
+            if pieces:
+                pieces.append('\n')
+                written += 1
+            count, complete = _decode_part(part, max_chars - written, pieces)
+            written += count
+            if not complete:
+                truncated = True
+                break
+        text = ''.join(pieces)
+    elif html_part is not None:
+        # Markup is mostly tags, so allow more of it before converting
+        _, complete = _decode_part(html_part, max_chars * 4, pieces)
+        text = html_to_text(''.join(pieces))
+        truncated = not complete or len(text) > max_chars
+        text = text[:max_chars]
+    else:
+        return None
+    if not text.strip():
+        return None
+    return text + TRUNCATED if truncated else text
+
+
+def snippet(text: Optional[str], length: int = INBOX_SNIPPET_CHARS) -> str:
+    """One line of at most `length` characters for list views, cut at a word"""
+    text = ' '.join((text or '').split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    space = cut.rfind(' ')
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip(' ,.;:') + '…'
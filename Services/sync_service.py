@@ -0,0 +1,165 @@
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from config.settings import CANVAS_SYNC_INTERVAL
+from Services import grade_analytics
+from Services.canvas_records import (assignments_from_canvas, courses_from_canvas,
+                                     submissions_from_canvas)
+from Services.canvas_store import CanvasStore
+from Services.change_feed import shared_feed
+
+
+class CanvasSyncWorker:
+    """Periodically mirrors Canvas into a CanvasStore on a daemon thread.
+
+    Each course remembers when it was last synced. The first pass downloads
+    everything; later passes only ask Canvas for submissions graded or
+    submitted since then and rewrite assignments whose updated_at changed.
+    Changed grades and assignments are published to the change feed.
+    """
+
+    def __init__(self, canvas_service, store: CanvasStore, interval: int = CANVAS_SYNC_INTERVAL,
+                 feed=shared_feed):
+        self.canvas_service = canvas_service
+        self.store = store
+        self.interval = interval
+        self.feed = feed
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='canvas-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                print(f"Canvas sync failed: {e}")
+            self._stop.wait(self.interval)
+
+    def sync_once(self) -> Dict:
+        """Run one sync pass; returns per-course errors, if any"""
+        service = self.canvas_service
+        first_pass = self.store.get_state('last_sync') is None
+        # Records, so the transport's validator cache keeps the trimmed form
+        courses = service._load_course_list(transform=courses_from_canvas)
+        changed_courses = self.store.replace_courses(courses)
+
+        result = service._fan_out(self._sync_course, [c['id'] for c in courses])
+        changed = self._publish_changes(courses, result['results'])
+        if result['errors']:
+            # Pages keep their cached copies until a pass gets everything
+            return result['errors']
+        self.store.set_state('last_sync', _now())
+        if changed_courses and not first_pass:
+            changed |= {'grades', 'assignments'}
+        # Pages read the store directly; drop cached copies of what changed
+        if changed:
+            service.invalidate_dashboard(changed)
+        return result['errors']
+
+    def _publish_changes(self, courses, changes: Dict[int, Dict]) -> Set[str]:
+        """Push grade and assignment changes to open pages; returns the event types sent"""
+        published = set()
+        grades = {course_id: grade_analytics.format_grade(change['grade'])
+                  for course_id, change in changes.items() if change['grade_changed']}
+        if grades:
+            summary = grade_analytics.summarize(
+                {'course_id': c['id'], 'percentage': (self.store.get_grade(c['id']) or {}).get('percentage')}
+                for c in courses)
+            self.feed.publish('grades', {'grades': grades, 'gpa': summary['gpa']})
+            published.add('grades')
+        assignments = {course_id: change['assignments']
+                       for course_id, change in changes.items() if change['assignments']}
+        if assignments:
+            self.feed.publish('assignments', {'courses': assignments})
+            published.add('assignments')
+        return published
+
+    def _sync_course(self, course_id: int) -> Dict:
+        """Sync one course; returns {'grade_changed', 'grade', 'assignments': changed ids}"""
+        service = self.canvas_service
+        state_key = f"course:{course_id}:last_sync"
+        since = self.store.get_state(state_key)
+        started = _now()
+        previous_grade = self.store.get_grade(course_id)
+
+        # Grades are one small request, so always refresh them
+        grade = service._load_enrollment_grade(course_id)
+        self.store.set_grade(course_id, grade)
+
+        # Assignments: only rows whose updated_at moved are rewritten
+        endpoint = f"/api/v1/courses/{course_id}/assignments"
+        params = {"per_page": 100}
+        if since is None:
+            params["include[]"] = ["submission"]
+        changed = self.store.sync_assignments(course_id, list(
+            service._paginate(endpoint, params=params, transform=assignments_from_canvas)))
+
+        # Submissions: after the first pass, only what was graded or submitted since
+        if since is not None:
+            self._sync_submissions(course_id, graded_since=since)
+            self._sync_submissions(course_id, submitted_since=since)
+
+        self.store.set_state(state_key, started)
+        # Everything is new on the first pass, so only later passes report changes
+        return {
+            'grade': grade,
+            'grade_changed': since is not None and
+                (previous_grade or {}).get('percentage') != (grade or {}).get('percentage'),
+            'assignments': changed if since is not None else []
+        }
+
+    def _sync_submissions(self, course_id: int, **since: str):
+        endpoint = f"/api/v1/courses/{course_id}/students/submissions"
+        params = {"student_ids[]": ["self"], "per_page": 100}
+        params.update(since)
+        submissions = list(self.canvas_service._paginate(endpoint, params=params,
+                                                         transform=submissions_from_canvas))
+        if submissions:
+            self.store.upsert_submissions(course_id, submissions)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+_worker: Optional[CanvasSyncWorker] = None
+_store: Optional[CanvasStore] = None
+_lock = threading.RLock()
+
+
+def get_canvas_store() -> CanvasStore:
+    """Return the process-wide local Canvas store"""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = CanvasStore()
+    return _store
+
+
+def start_sync_worker(canvas_service) -> Optional[CanvasSyncWorker]:
+    """Attach the local store to canvas_service and start syncing into it.
+
+    Does nothing when CANVAS_SYNC_INTERVAL is 0.
+    """
+    global _worker
+    if _worker is not None or CANVAS_SYNC_INTERVAL <= 0:
+        return _worker
+    with _lock:
+        if _worker is None:
+            store = get_canvas_store()
+            canvas_service.attach_store(store)
+            _worker = CanvasSyncWorker(canvas_service, store)
+            _worker.start()
+    return _worker
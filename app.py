@@ -1,14 +1,18 @@
-from flask import Flask, jsonify, request, render_template, redirect, url_for, send_file
+from flask import Flask, Response, jsonify, request, render_template, redirect, url_for, send_file, stream_template, stream_with_context
 from flask_wtf.csrf import CSRFProtect
 from flask_caching import Cache
 from Services.docs_service import DocsService
-from Services.canvas_service import CanvasService 
+from Services.canvas_service import get_canvas_service
 from dotenv import load_dotenv
 import os
-from datetime import datetime, timedelta
-import calendar
+from datetime import datetime, timedelta, timezone
 from Services.ai_service import AIService
-from Services.inbox_services import InboxService
+from Services.inbox_services import InboxService, start_inbox_watcher
+from Services.sync_service import start_sync_worker
+from Services.cache import begin_request_memo, end_request_memo
+from Services.change_feed import shared_feed
+from Services import grade_analytics
+from config.settings import CACHE_TTLS
 from PIL import Image
 
 load_dotenv()
@@ -18,7 +22,7 @@ app.debug = True
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
 csrf = CSRFProtect(app)
 cache = Cache(app, config={
-    'CACHE_TYPE': 'simple',
+    'CACHE_TYPE': 'Services.flask_cache.SharedCacheBackend',
     'CACHE_DEFAULT_TIMEOUT': 300
 })
 
@@ -27,6 +31,34 @@ print("Static folder absolute path:", os.path.abspath(app.static_folder))
 print("Looking for image at:", os.path.join(app.static_folder, 'images/class-icons/default_icon.png'))
 print("Image exists:", os.path.exists(os.path.join(app.static_folder, 'images/class-icons/default_icon.png')))
 
+@app.before_request
+def ensure_canvas_sync():
+    # Started on the first request so the debug reloader's parent process
+    # never runs a second worker
+    try:
+        start_sync_worker(get_canvas_service())
+    except ValueError as e:
+        print(f"Canvas sync not started: {e}")
+
+# Cache keys of the dashboard fragments that show each kind of change
+FRAGMENT_KEYS = {'grades': ['dashboard/classes'], 'assignments': ['dashboard/calendar']}
+
+def drop_changed_fragments(event):
+    # Pages opened after a change must not get the old cached fragment
+    for key in FRAGMENT_KEYS.get(event['type'], []):
+        cache.delete(key)
+
+shared_feed.add_listener(drop_changed_fragments)
+
+@app.before_request
+def start_request_memo():
+    # Identical Canvas reads made while handling one request are fetched once
+    begin_request_memo()
+
+@app.teardown_request
+def clear_request_memo(exc):
+    end_request_memo()
+
 @app.template_filter('format_date')
 def format_date(date_str):
     if not date_str:
@@ -52,115 +84,77 @@ def index():
     return render_template('index.html')
 
 @app.route('/dashboard')
-@cache.cached(timeout=300)
 def dashboard():
-    canvas_service = CanvasService()
-    classes = canvas_service.get_classes()
-    user_name = canvas_service.get_user_name()
-    user_avatar = canvas_service.get_user_profile_picture()
-    
-    # Calculate GPA
-    total_points = 0
-    total_credits = 0
+    # Only the shell is rendered here; each panel loads from its own
+    # cached fragment so a slow source never holds up the others
+    return render_template('dashboard.html')
+
+@app.route('/dashboard/fragments/classes')
+@cache.cached(timeout=CACHE_TTLS['grades'], key_prefix='dashboard/classes')
+def dashboard_classes_fragment():
+    # Served stale-while-revalidate, so an expired entry never blocks the page
+    data = get_canvas_service().get_dashboard_grades()
+    # Copy the shared cached course records before annotating them with grades
+    classes = [dict(c) for c in data['classes']]
     
+    # GPA and letter grades for every class in one pass
+    summary = grade_analytics.summarize(
+        {'course_id': c['id'], 'term': c.get('term'),
+         'percentage': (data['grades'].get(c['id']) or {}).get('percentage')}
+        for c in classes)
     for class_info in classes:
-        try:
-            grade_info = canvas_service.get_grades(class_info['id'])
-            if grade_info and grade_info['percentage'] is not None:
-                # Assuming each class is 3 credits
-                credits = 3
-                percentage = grade_info['percentage']
-                
-                # Convert percentage to GPA points
-                if percentage >= 93: points = 4.0
-                elif percentage >= 90: points = 3.7
-                elif percentage >= 87: points = 3.3
-                elif percentage >= 83: points = 3.0
-                elif percentage >= 80: points = 2.7
-                elif percentage >= 77: points = 2.3
-                elif percentage >= 73: points = 2.0
-                elif percentage >= 70: points = 1.7
-                elif percentage >= 67: points = 1.3
-                elif percentage >= 63: points = 1.0
-                elif percentage >= 60: points = 0.7
-                else: points = 0.0
-                
-                total_points += points * credits
-                total_credits += credits
-                
-            class_info['grade'] = f"{grade_info['percentage']:.1f}% ({grade_info['letter']})" if grade_info else 'N/A'
-                
-        except Exception as e:
-            print(f"Error getting grades for {class_info['name']}: {e}")
-            class_info['grade'] = 'N/A'
-    
-    # Calculate final GPA
-    calculated_gpa = round(total_points / total_credits, 2) if total_credits > 0 else None
+        class_info['grade'] = grade_analytics.format_grade(data['grades'].get(class_info['id']))
     
-    # Get all assignments
-    assignments = canvas_service.get_all_assignments()
-    
-    # Calendar data
+    return render_template('partials/dashboard_classes.html',
+                         classes=classes,
+                         calculated_gpa=summary['gpa'])
+
+@app.route('/dashboard/fragments/calendar')
+@cache.cached(timeout=CACHE_TTLS['assignments'], key_prefix='dashboard/calendar')
+def dashboard_calendar_fragment():
+    # A lookup in the calendar index, which is rebuilt once per data refresh
     today = datetime.now()
-    cal = calendar.monthcalendar(today.year, today.month)
-    calendar_days = []
-    
-    # Get month name and year
-    current_month_year = today.strftime('%B %Y')
-    
-    # Create a dictionary to store assignments by date
-    assignment_dict = {}
-    for assignment in assignments:
-        if assignment.get('due_at'):
-            due_date = datetime.strptime(assignment['due_at'], '%Y-%m-%dT%H:%M:%SZ')
-            if due_date.year == today.year and due_date.month == today.month:
-                date_key = due_date.day
-                if date_key not in assignment_dict:
-                    assignment_dict[date_key] = []
-                assignment_dict[date_key].append({
-                    'id': assignment['id'],
-                    'course_id': assignment['course_id'],
-                    'name': assignment['name'],
-                    'course_name': assignment['course_name']
-                })
-    
-    # Calculate previous month's spillover
-    if cal[0][0] == 0:
-        last_month = today.replace(day=1) - timedelta(days=1)
-        last_month_days = calendar.monthrange(last_month.year, last_month.month)[1]
-        start_day = cal[0].index(1)
-        for i in range(start_day):
-            calendar_days.append({
-                'day': last_month_days - start_day + i + 1,
-                'in_month': False,
-                'is_today': False,
-                'assignments': []
-            })
-    
-    # Current month's days
-    for week in cal:
-        for day in week:
-            if day != 0:
-                calendar_days.append({
-                    'day': day,
-                    'in_month': True,
-                    'is_today': day == today.day,
-                    'assignments': assignment_dict.get(day, [])
-                })
-    
-    return render_template('dashboard.html', 
-                         classes=classes, 
-                         user_name=user_name, 
-                         user_avatar=user_avatar,
-                         calendar_days=calendar_days,
-                         current_month_year=current_month_year,
-                         calculated_gpa=calculated_gpa)
+    month = get_canvas_service().get_calendar_month(today.year, today.month, today=today)
+    return render_template('partials/dashboard_calendar.html',
+                         calendar_days=month['days'],
+                         current_month_year=month['label'],
+                         calendar_year=month['year'],
+                         calendar_month=month['month'])
+
+@app.route('/dashboard/fragments/profile')
+@cache.cached(timeout=CACHE_TTLS['user_name'], key_prefix='dashboard/profile')
+def dashboard_profile_fragment():
+    data = get_canvas_service().get_dashboard_profile()
+    return render_template('partials/dashboard_profile.html',
+                         user_name=data['user_name'],
+                         user_avatar=data['user_avatar'])
+
+@app.route('/api/calendar')
+def calendar_api():
+    today = datetime.now()
+    year = request.args.get('year', today.year, type=int)
+    month = request.args.get('month', today.month, type=int)
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        return jsonify({'error': 'Invalid year or month'}), 400
+    response = jsonify(get_canvas_service().get_calendar_month(year, month, today=today))
+    # Month data only changes when Canvas does; let the browser reuse it briefly
+    response.headers['Cache-Control'] = 'private, max-age=300'
+    return response
+
+@app.route('/api/events')
+def events():
+    # One long-lived Server-Sent Events stream per open page; grade,
+    # assignment and inbox changes are pushed here instead of polled for
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    return Response(stream_with_context(shared_feed.stream(last_id)),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/create-homework-doc', methods=['POST'])
 def create_homework_doc():
     try:
         docs_service = DocsService()
-        canvas_service = CanvasService()
+        canvas_service = get_canvas_service()
         
         # Get data from request
         data = request.json
@@ -206,39 +200,39 @@ def create_homework_doc():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/assignments')
-@cache.cached(timeout=300)
 def assignments():
-    canvas_service = CanvasService()
-    courses = canvas_service.get_classes()
-    
-    # Get assignments for each course
-    assignments = {}
-    for course in courses:
-        course_assignments = canvas_service.get_current_assignments(course['id'])
-        if course_assignments:
+    canvas_service = get_canvas_service()
+
+    def assignment_sections():
+        # Each course is rendered as soon as its assignments arrive
+        courses = {c['id']: c for c in canvas_service.get_classes()}
+        for course_id, course_assignments, error in canvas_service.iter_current_assignments_many(list(courses)):
+            if not course_assignments:
+                continue
             # Process each assignment to ensure it has html_url
             processed_assignments = []
             for assignment in course_assignments:
                 processed_assignment = assignment.copy()  # Create a copy of the assignment
                 # Construct the Canvas URL for the assignment if it's not already present
                 if 'html_url' not in processed_assignment:
-                    processed_assignment['html_url'] = f"{canvas_service.canvas_url}/courses/{course['id']}/assignments/{assignment['id']}"
+                    processed_assignment['html_url'] = f"{canvas_service.canvas_url}/courses/{course_id}/assignments/{assignment['id']}"
                 processed_assignments.append(processed_assignment)
-            assignments[course['id']] = processed_assignments
-    
-    return render_template('assignments.html', 
-                         courses=courses,
-                         assignments=assignments)
+            yield courses[course_id], processed_assignments
+
+    # Streamed so the page head reaches the browser before the template calls
+    # assignment_sections
+    return Response(stream_template('assignments.html', assignment_sections=assignment_sections))
 
 @app.route('/make-hw-doc')
 def make_hw_doc():
-    canvas_service = CanvasService()
+    canvas_service = get_canvas_service()
     courses = canvas_service.get_classes()
     
     # Get assignments for each course
     assignments = []
+    fetched = canvas_service.get_current_assignments_many([c['id'] for c in courses])
     for course in courses:
-        course_assignments = canvas_service.get_current_assignments(course['id'])
+        course_assignments = fetched['results'].get(course['id'], [])
         for assignment in course_assignments:
             assignments.append({
                 'index': len(assignments),
@@ -330,40 +324,19 @@ def video_prompt():
 @cache.cached(timeout=300)
 def check_grades():
     try:
-        canvas_service = CanvasService()
+        canvas_service = get_canvas_service()
         courses = canvas_service.get_classes()
         
         # Get grades for each course
         courses_with_grades = []
+        grades = canvas_service.get_grades_many([c['id'] for c in courses])
         for course in courses:
-            print(f"\nProcessing course: {course['name']}")  # Debug log
-            grades = canvas_service.get_grades(course['id'])
-            print(f"Raw grades data: {grades}")  # Debug log
-            
-            if grades:
-                for enrollment in grades:
-                    # Check if this enrollment belongs to the current user
-                    if enrollment.get('type') == 'StudentEnrollment':
-                        # Get the grade from the grades object
-                        grade_data = enrollment.get('grades', {})
-                        print(f"Grade data: {grade_data}")  # Debug log
-                        
-                        # Try to get any available score in this order:
-                        # 1. Current score
-                        # 2. Final score
-                        # 3. Unposted current score
-                        grade = grade_data.get('current_score')
-                        if grade is None:
-                            grade = grade_data.get('final_score')
-                        if grade is None:
-                            grade = grade_data.get('unposted_current_score')
-                        
-                        courses_with_grades.append({
-                            'name': course['name'],
-                            'grade': grade if grade is not None else 'N/A'
-                        })
-                        print(f"Added course with grade: {grade}")  # Debug log
-                        break  # Found the student enrollment, no need to check others
+            grade_info = grades['results'].get(course['id'])
+            grade = grade_info['percentage'] if grade_info else None
+            courses_with_grades.append({
+                'name': course['name'],
+                'grade': grade if grade is not None else 'N/A'
+            })
     
         print(f"Final courses_with_grades: {courses_with_grades}")  # Debug log
         return render_template('check_grades.html', courses=courses_with_grades)
@@ -429,48 +402,61 @@ def api_get_hw_help():
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
 @app.route('/check-inbox')
-@cache.cached(timeout=300)
 def check_inbox():
-    try:
-        inbox_service = InboxService()
-        sender = request.args.get('sender', 'all') 
-        
-        try:
-            allowed_senders = inbox_service.allowed_senders
-            print(f"Loaded allowed senders: {allowed_senders}")  # Debug print
+    sender = request.args.get('sender', 'all') 
 
-        except Exception as e:
-            print(f"Error getting allowed senders: {str(e)}")  # Debug print
-            allowed_senders = []
-        
-        emails = []
-        if sender:
+    def load_inbox():
+        # Called by the template after the page head has been sent
+        try:
+            inbox_service = InboxService()
+            # Gmail credentials work, so new mail can be watched for from now on
+            start_inbox_watcher()
+            
             try:
-                response = inbox_service.get_emails_from_sender(sender)
-                # Check if response is a dictionary and get emails from it
-                if isinstance(response, dict):
-                    emails = response.get('emails', [])
-                else:
-                    # If response is a list, use it directly
-                    emails = response if isinstance(response, list) else []
-                
+                allowed_senders = inbox_service.allowed_senders
+                print(f"Loaded allowed senders: {allowed_senders}")  # Debug print
+
             except Exception as e:
-                print(f"Error getting emails: {str(e)}")  
-                return render_template('check_inbox.html', 
-                                    emails=[],
-                                    allowed_senders=allowed_senders,
-                                    error=str(e))
-                                    
-        return render_template('check_inbox.html', 
-                             emails=emails,
-                             allowed_senders=allowed_senders,
-                             current_sender=sender)
+                print(f"Error getting allowed senders: {str(e)}")  # Debug print
+                allowed_senders = []
+            
+            emails = []
+            if sender:
+                try:
+                    response = inbox_service.get_emails_from_sender(sender)
+                    # Check if response is a dictionary and get emails from it
+                    if isinstance(response, dict):
+                        emails = response.get('emails', [])
+                    else:
+                        # If response is a list, use it directly
+                        emails = response if isinstance(response, list) else []
+                    
+                except Exception as e:
+                    print(f"Error getting emails: {str(e)}")  
+                    return {'emails': [], 'allowed_senders': allowed_senders, 'error': str(e)}
+                                        
+            return {'emails': emails, 'allowed_senders': allowed_senders, 'error': None}
+        except Exception as e:
+            print(f"Error in check_inbox route: {str(e)}") 
+            return {'emails': [], 'allowed_senders': [], 'error': str(e)}
+
+    return Response(stream_template('check_inbox.html', current_sender=sender, load_inbox=load_inbox))
+
+@app.route('/api/inbox/messages/<message_id>')
+def inbox_message(message_id):
+    # The inbox list only carries snippets; a body is fetched when its email is opened
+    try:
+        inbox_service = InboxService()
+        # Only mail from the allowed senders, which is what the store holds
+        if message_id not in inbox_service.store.known_ids([message_id]):
+            return jsonify({'error': 'Message not found'}), 404
+        body = inbox_service.get_message_body(message_id)
+        if body is None:
+            return jsonify({'error': 'Message not found'}), 404
+        return jsonify({'id': message_id, 'body': body})
     except Exception as e:
-        print(f"Error in check_inbox route: {str(e)}") 
-        return render_template('check_inbox.html', 
-                             emails=[],
-                             allowed_senders=[],
-                             error=str(e))
+        print(f"Error getting message body: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/todo-list')
 def todo_list():
@@ -484,7 +470,7 @@ def generate_todo_pdf():
         title = data.get('title', 'Todo List')
         items = data.get('items', [])
         
-        canvas_service = CanvasService()
+        canvas_service = get_canvas_service()
         pdf_path = canvas_service.create_todo_list(title, items)
         
         if pdf_path and os.path.exists(pdf_path):
@@ -504,9 +490,9 @@ def generate_todo_pdf():
 @app.route('/api/get-assignments')
 def get_assignments_api():
     try:
-        canvas_service = CanvasService()
+        canvas_service = get_canvas_service()
         assignments = canvas_service.get_all_assignments()
-        return jsonify(assignments)
+        return jsonify([assignment.to_dict() for assignment in assignments])
     except Exception as e:
         print(f"Error fetching assignments: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -514,13 +500,14 @@ def get_assignments_api():
 @app.route('/api/assignment-details/<int:course_id>/<int:assignment_id>')
 def get_assignment_details(course_id, assignment_id):
     try:
-        canvas_service = CanvasService()
+        canvas_service = get_canvas_service()
         assignments = canvas_service.get_current_assignments(course_id)
         
         # Find the specific assignment
         assignment = next((a for a in assignments if a['id'] == assignment_id), None)
         
         if assignment:
+            assignment = assignment.to_dict()
             # Get the course name
             courses = canvas_service.get_classes()
             course = next((c for c in courses if c['id'] == course_id), None)
@@ -535,41 +522,76 @@ def get_assignment_details(course_id, assignment_id):
         print(f"Error getting assignment details: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/grade-projection')
+def grade_projection_api():
+    try:
+        canvas_service = get_canvas_service()
+        projector = canvas_service.get_grade_projector()
+        if projector is None:
+            return jsonify({'error': 'Could not load assignment groups'}), 500
+
+        # score: percent expected on the remaining work; target: desired final percent
+        score = request.args.get('score', 100, type=float)
+        target = request.args.get('target', 90, type=float)
+        names = {c['id']: c['name'] for c in canvas_service.get_classes()}
+        current = projector.current_scores()
+        projected = projector.project(score)
+        best = projector.best_case()
+        worst = projector.worst_case()
+        required = projector.required(target)
+        return jsonify({
+            str(course_id): {
+                'name': names.get(course_id),
+                'current': current[course_id],
+                'projected': projected[course_id],
+                'best': best[course_id],
+                'worst': worst[course_id],
+                'required': required[course_id]
+            }
+            for course_id in projector.course_ids
+        })
+    except Exception as e:
+        print(f"Error in grade projection: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/course/<int:course_id>')
 def course_page(course_id):
     try:
-        canvas_service = CanvasService()
+        canvas_service = get_canvas_service()
         course = next((c for c in canvas_service.get_classes() if c['id'] == course_id), None)
         
         if not course:
             return "Course not found", 404
 
-        # Get the grade info if it's not already in the course object
-        if 'grade' not in course:
-            grade_info = canvas_service.get_grades(course_id)
-            if grade_info and grade_info['percentage'] is not None:
-                course['grade'] = f"{grade_info['percentage']:.1f}% ({grade_info['letter']})"
-            else:
-                course['grade'] = 'N/A'
+        def load_course_details():
+            # Called by the template after the page head has been sent
+            try:
+                grade_info = canvas_service.get_grades(course_id)
+                if grade_info and grade_info['percentage'] is not None:
+                    grade = f"{grade_info['percentage']:.1f}% ({grade_info['letter']})"
+                else:
+                    grade = 'N/A'
+
+                # Upcoming and past assignments come from a single download
+                assignments = canvas_service.get_assignment_views(course_id)['upcoming']
+                past_assignments = canvas_service.get_past_assignments(course_id)
+
+                # Process assignments to ensure they have html_url
+                processed_assignments = []
+                for assignment in assignments:
+                    processed_assignment = assignment.copy()
+                    if 'html_url' not in processed_assignment:
+                        processed_assignment['html_url'] = f"{canvas_service.canvas_url}/courses/{course_id}/assignments/{assignment['id']}"
+                    processed_assignments.append(processed_assignment)
+                return {'grade': grade, 'assignments': processed_assignments,
+                        'past_assignments': past_assignments}
+            except Exception as e:
+                print(f"Error in course_page: {str(e)}")
+                return {'grade': 'N/A', 'assignments': [], 'past_assignments': []}
 
-        # Get current assignments
-        assignments = canvas_service.get_current_assignments(course_id)
-        
-        # Get past assignments
-        past_assignments = canvas_service.get_past_assignments(course_id)
-        
-        # Process assignments to ensure they have html_url
-        processed_assignments = []
-        for assignment in assignments:
-            processed_assignment = assignment.copy()
-            if 'html_url' not in processed_assignment:
-                processed_assignment['html_url'] = f"{canvas_service.canvas_url}/courses/{course_id}/assignments/{assignment['id']}"
-            processed_assignments.append(processed_assignment)
-        
-        return render_template('course_page.html', 
-                             course=course,
-                             assignments=processed_assignments,
-                             past_assignments=past_assignments)
+        return Response(stream_template('course_page.html',
+                                        course=course,
+                                        load_course_details=load_course_details))
     except Exception as e:
         print(f"Error in course_page: {str(e)}")
         return str(e), 500
@@ -577,38 +599,25 @@ def course_page(course_id):
 @app.route('/select-assignment-for-videos')
 def select_assignment_for_videos():
     try:
-        canvas_service = CanvasService()
-        courses = canvas_service.get_classes()
+        canvas_service = get_canvas_service()
         
-        current_time = datetime.now()
+        current_time = datetime.now(timezone.utc)
         two_weeks_future = current_time + timedelta(days=14)
         
+        # Already sorted by due date
+        due_soon = canvas_service.get_assignments_due_between(current_time - timedelta(days=1),
+                                                              two_weeks_future)
         current_assignments = []
-        for course in courses:
-            try:
-                course_assignments = canvas_service.get_current_assignments(course['id'])
-                if course_assignments:
-                    for assignment in course_assignments:
-                        if assignment.get('due_at'):
-                            due_date = datetime.strptime(assignment['due_at'], '%Y-%m-%dT%H:%M:%SZ')
-                            if (due_date > current_time - timedelta(days=1) and 
-                                due_date < two_weeks_future):
-                                # Add course name to assignment
-                                assignment['course_name'] = course['name']
-                                # Ensure description exists and is a string
-                                assignment['description'] = str(assignment.get('description', ''))
-                                # Clean description HTML if present
-                                if assignment['description']:
-                                    # Basic HTML tag removal (you might want to use a proper HTML parser)
-                                    description = assignment['description'].replace('<p>', '').replace('</p>', '\n')
-                                    assignment['description'] = description.strip()
-                                current_assignments.append(assignment)
-            except Exception as e:
-                print(f"Error processing course {course['name']}: {e}")
-                continue
-        
-        # Sort by due date
-        current_assignments.sort(key=lambda x: datetime.strptime(x['due_at'], '%Y-%m-%dT%H:%M:%SZ'))
+        for assignment in due_soon:
+            assignment = assignment.to_dict()
+            # Ensure description exists and is a string
+            assignment['description'] = str(assignment.get('description') or '')
+            # Clean description HTML if present
+            if assignment['description']:
+                # Basic HTML tag removal (you might want to use a proper HTML parser)
+                description = assignment['description'].replace('<p>', '').replace('</p>', '\n')
+                assignment['description'] = description.strip()
+            current_assignments.append(assignment)
         
         return render_template('select_assignment_for_videos.html', 
                              assignments=current_assignments)
@@ -654,7 +663,7 @@ def graphing_calculator():
 @cache.cached(timeout=300)
 def assignment_details(course_id, assignment_id):
     try:
-        canvas_service = CanvasService()
+        canvas_service = get_canvas_service()
         details = canvas_service.get_assignment_details(course_id, assignment_id)
         
         if not details:
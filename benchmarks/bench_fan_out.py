@@ -0,0 +1,79 @@
+"""Dashboard wall time against a fake Canvas as the course count grows.
+
+Compares fetching each course's grade and assignments one course at a time
+with the `_many` fan-out, then runs several page loads at once to check that
+CANVAS_MAX_WORKERS bounds the requests in flight across the process.
+
+    python -m benchmarks.bench_fan_out
+"""
+import os
+import threading
+import time
+
+from benchmarks.fake_canvas import FakeCanvas
+
+COURSE_COUNTS = (2, 4, 8, 16)
+CONCURRENT_PAGES = 4
+LATENCY = 0.05
+
+
+def dashboard_serial(service):
+    classes = service.get_classes()
+    for course in classes:
+        service.get_grades(course['id'])
+        service._fetch_course_assignments(course['id'])
+
+
+def dashboard_fan_out(service):
+    course_ids = [c['id'] for c in service.get_classes()]
+    service.get_grades_many(course_ids)
+    service._fan_out(service._fetch_course_assignments, course_ids)
+
+
+def timed(canvas, service, load):
+    from Services.cache import shared_cache
+    shared_cache.clear()
+    canvas.reset()
+    start = time.perf_counter()
+    load(service)
+    return time.perf_counter() - start, canvas.requests
+
+
+def main():
+    canvas = FakeCanvas(latency=LATENCY).start()
+    os.environ['CANVAS_URL'] = canvas.url
+    os.environ['CANVAS_API_TOKEN'] = 'benchmark'
+    from config.settings import CANVAS_MAX_WORKERS
+    from Services.canvas_service import CanvasService
+    from Services.cache import shared_cache
+
+    service = CanvasService()
+    print(f"latency {LATENCY * 1000:.0f} ms per request, CANVAS_MAX_WORKERS={CANVAS_MAX_WORKERS}")
+    print(f"{'courses':>7} {'requests':>8} {'serial':>9} {'fan-out':>9}")
+    for courses in COURSE_COUNTS:
+        canvas.courses = courses
+        serial, requests = timed(canvas, service, dashboard_serial)
+        fan_out, _ = timed(canvas, service, dashboard_fan_out)
+        print(f"{courses:>7} {requests:>8} {serial * 1000:>7.0f}ms {fan_out * 1000:>7.0f}ms")
+
+    # Separate tokens, so single-flight can't merge the page loads into one
+    canvas.courses = max(COURSE_COUNTS)
+    shared_cache.clear()
+    users = []
+    for user in range(CONCURRENT_PAGES):
+        os.environ['CANVAS_API_TOKEN'] = f'benchmark-{user}'
+        users.append(CanvasService())
+        users[-1].get_classes()
+    canvas.reset()
+    pages = [threading.Thread(target=dashboard_fan_out, args=(user,)) for user in users]
+    for page in pages:
+        page.start()
+    for page in pages:
+        page.join()
+    print(f"{CONCURRENT_PAGES} concurrent page loads, {canvas.requests} requests: at most "
+          f"{canvas.peak_in_flight} in flight (CANVAS_MAX_WORKERS={CANVAS_MAX_WORKERS})")
+    canvas.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Gmail round trips and wall time: one GET per message vs batch requests.
+
+Runs against a fake Gmail with a fixed latency. Fetches the same message ids
+one messages().get at a time, as the inbox used to, and through
+InboxService._get_gmail_messages, which sends GMAIL_BATCH_SIZE per batch.
+Then times a first inbox sync, which lists and fetches metadata only.
+
+    python -m benchmarks.bench_gmail_batch
+"""
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fake_gmail import SENDERS, FakeGmail
+
+MESSAGE_COUNTS = (20, 100, 200)
+LATENCY = 0.02
+
+
+def make_inbox(gmail, store_path):
+    from Services.inbox_services import InboxService
+    from Services.inbox_store import InboxStore
+
+    # Built by hand: __init__ would look for OAuth credentials
+    inbox = InboxService.__new__(InboxService)
+    inbox.allowed_senders = list(SENDERS)
+    inbox.gmail_service, inbox.gmail_credentials = gmail.build_service()
+    inbox._local = threading.local()
+    inbox.store = InboxStore(store_path)
+    return inbox
+
+
+def one_by_one(inbox, message_ids):
+    messages = inbox.gmail_service.users().messages()
+    return [messages.get(userId='me', id=message_id, format='full').execute(http=inbox._http())
+            for message_id in message_ids]
+
+
+def timed(gmail, fetch, *args):
+    gmail.reset()
+    start = time.perf_counter()
+    result = fetch(*args)
+    return time.perf_counter() - start, gmail.requests, result
+
+
+def main():
+    gmail = FakeGmail(latency=LATENCY).start()
+    from config.settings import GMAIL_BATCH_SIZE
+
+    with tempfile.TemporaryDirectory() as directory:
+        inbox = make_inbox(gmail, os.path.join(directory, 'inbox.sqlite3'))
+        message_ids = sorted(gmail.messages)
+        print(f"latency {LATENCY * 1000:.0f} ms per round trip, GMAIL_BATCH_SIZE={GMAIL_BATCH_SIZE}")
+        print(f"{'messages':>8} {'one-by-one':>18} {'batched':>18}")
+        for count in MESSAGE_COUNTS:
+            ids = message_ids[:count]
+            serial, serial_trips, serial_messages = timed(gmail, one_by_one, inbox, ids)
+            batched, batched_trips, batched_messages = timed(gmail, inbox._get_gmail_messages, ids)
+            assert serial_messages == batched_messages
+            print(f"{count:>8} {serial_trips:>6} trips {serial * 1000:>5.0f}ms "
+                  f"{batched_trips:>6} trips {batched * 1000:>5.0f}ms")
+
+        elapsed, trips, _ = timed(gmail, inbox.sync_inbox)
+        stored = inbox.store.get_page(inbox.allowed_senders, 1, 1)[1]
+        print(f"first sync of {stored} messages from {len(SENDERS)} senders: "
+              f"{trips} round trips, {elapsed * 1000:.0f}ms")
+        inbox.store._conn.close()
+    gmail.stop()
+
+
+if __name__ == '__main__':
+    main()
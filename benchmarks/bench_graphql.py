@@ -0,0 +1,55 @@
+"""Dashboard round-trips, wall time and bytes: REST fan-out vs the GraphQL path.
+
+Loads what the dashboard fragments read (courses, grades, profile and every
+assignment) from a fake Canvas with a cold cache, once per CANVAS_FETCH_MODE.
+GraphQL is also run against courses with a large roster, which shouldn't
+cost anything since the query only asks for the user's own enrollment.
+
+    python -m benchmarks.bench_graphql
+"""
+import os
+import time
+
+from benchmarks.fake_canvas import FakeCanvas
+
+COURSES = 8
+LATENCY = 0.05
+ROSTER = 200
+
+
+def dashboard(service):
+    service.get_dashboard_grades()
+    service.get_dashboard_profile()
+    service.get_all_assignments()
+
+
+def measure(canvas, service, mode):
+    from Services.cache import shared_cache
+    service.fetch_mode = mode
+    shared_cache.clear()
+    canvas.reset()
+    start = time.perf_counter()
+    dashboard(service)
+    return time.perf_counter() - start
+
+
+def main():
+    canvas = FakeCanvas(courses=COURSES, latency=LATENCY).start()
+    os.environ['CANVAS_URL'] = canvas.url
+    os.environ['CANVAS_API_TOKEN'] = 'benchmark'
+    from Services.canvas_service import CanvasService
+
+    service = CanvasService()
+    print(f"{COURSES} courses, {canvas.assignments} assignments each, {LATENCY * 1000:.0f} ms per request")
+    print(f"{'mode':<22} {'requests':>8} {'wall':>8} {'KB':>8}")
+    for label, mode, classmates in (('rest', 'rest', 0),
+                                    ('graphql', 'graphql', 0),
+                                    (f'graphql, {ROSTER} students', 'graphql', ROSTER)):
+        canvas.classmates = classmates
+        elapsed = measure(canvas, service, mode)
+        print(f"{label:<22} {canvas.requests:>8} {elapsed * 1000:>6.0f}ms {canvas.bytes_sent / 1024:>8.0f}")
+    canvas.stop()
+
+
+if __name__ == '__main__':
+    main()
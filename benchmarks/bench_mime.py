@@ -0,0 +1,127 @@
+"""Gmail body extraction: time, peak memory and deep nesting.
+
+Runs mime_text.extract_text and the recursive extractor InboxService used
+before it over the same synthetic payloads: ordinary multipart/alternative
+mail, newsletters with very large parts, HTML-only mail and many small parts
+nested deep. Peak memory is what tracemalloc sees while the whole corpus is
+extracted.
+
+    python -m benchmarks.bench_mime
+"""
+import base64
+import random
+import time
+import tracemalloc
+
+CORPUS_SIZE = 200
+NEWSLETTER_WORDS = 200_000
+DEEP_NESTING = 2000
+WORDS = 'exam homework grade due lecture résumé café canvas quiz reading'.split()
+
+
+def recursive_extract(payload):
+    """The extractor from before mime_text: decodes every text/plain part in full"""
+    def get_body_from_part(part):
+        if part.get('body', {}).get('data'):
+            try:
+                data = part['body']['data']
+                padded_data = data + ('=' * (4 - len(data) % 4))
+                decoded = base64.urlsafe_b64decode(padded_data)
+                return decoded.decode('utf-8', errors='replace')
+            except Exception:
+                return None
+        return None
+
+    if 'parts' in payload:
+        text_content = []
+        for part in payload['parts']:
+            if part.get('mimeType') == 'text/plain':
+                content = get_body_from_part(part)
+                if content:
+                    text_content.append(content)
+            elif 'parts' in part:
+                nested_content = recursive_extract(part)
+                if nested_content:
+                    text_content.append(nested_content)
+        return '\n'.join(filter(None, text_content))
+    else:
+        return get_body_from_part(payload)
+
+
+def leaf(mime_type, text):
+    data = base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+    return {'mimeType': mime_type,
+            'headers': [{'name': 'Content-Type', 'value': f'{mime_type}; charset="utf-8"'}],
+            'body': {'data': data, 'size': len(data)}}
+
+
+def nest(parts, depth):
+    node = {'mimeType': 'multipart/mixed', 'parts': parts}
+    for _ in range(depth):
+        node = {'mimeType': 'multipart/mixed', 'parts': [node]}
+    return node
+
+
+def make_corpus(rng):
+    def words(count):
+        return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+    corpus = []
+    for i in range(CORPUS_SIZE):
+        kind = i % 4
+        if kind == 0:
+            corpus.append(nest([leaf('text/plain', words(300)),
+                                leaf('text/html', f'<p>{words(300)}</p>')], 2))
+        elif kind == 1:
+            corpus.append(nest([leaf('text/plain', words(NEWSLETTER_WORDS)),
+                                leaf('text/html', f'<div>{words(NEWSLETTER_WORDS)}</div>')], 6))
+        elif kind == 2:
+            corpus.append(nest([leaf('text/html', f'<style>h1 {{}}</style><h1>Hi</h1><p>{words(2000)}</p>')], 3))
+        else:
+            corpus.append(nest([leaf('text/plain', words(50)) for _ in range(40)], 25))
+    return corpus
+
+
+def measure(extract, corpus):
+    tracemalloc.start()
+    start = time.perf_counter()
+    texts = [extract(payload) for payload in corpus]
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, texts
+
+
+def main():
+    from config.settings import INBOX_BODY_MAX_CHARS
+    from Services import mime_text
+
+    corpus = make_corpus(random.Random(1))
+    print(f"{len(corpus)} payloads, INBOX_BODY_MAX_CHARS={INBOX_BODY_MAX_CHARS}")
+    print(f"{'extractor':<12} {'wall':>8} {'peak MB':>8} {'chars':>10}")
+    results = {}
+    for label, extract in (('recursive', recursive_extract), ('mime_text', mime_text.extract_text)):
+        elapsed, peak, texts = measure(extract, corpus)
+        results[label] = texts
+        chars = sum(len(text or '') for text in texts)
+        print(f"{label:<12} {elapsed * 1000:>6.0f}ms {peak / 1e6:>8.1f} {chars:>10}")
+
+    small = [i for i, payload in enumerate(corpus) if i % 4 in (0, 3)]
+    same = sum(results['recursive'][i] == results['mime_text'][i] for i in small)
+    print(f"plain-text mail under the cap: {same} of {len(small)} identical")
+    html_only = next(i for i in range(len(corpus)) if i % 4 == 2)
+    print(f"HTML-only mail: recursive {results['recursive'][html_only]!r}, "
+          f"mime_text {len(results['mime_text'][html_only])} chars")
+
+    deep = nest([leaf('text/plain', 'deep')], DEEP_NESTING)
+    try:
+        recursive_extract(deep)
+        print(f"{DEEP_NESTING} levels deep: recursive ok")
+    except RecursionError:
+        print(f"{DEEP_NESTING} levels deep: recursive raises RecursionError")
+    print(f"{DEEP_NESTING} levels deep: mime_text returns {mime_text.extract_text(deep)!r} "
+          f"(parts below MAX_DEPTH={mime_text.MAX_DEPTH} are skipped)")
+
+
+if __name__ == '__main__':
+    main()
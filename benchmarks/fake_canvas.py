@@ -0,0 +1,225 @@
+"""A local stand-in for the Canvas REST and GraphQL APIs, used by the benchmarks.
+
+Serves the endpoints CanvasService reads with a fixed per-request latency,
+Link-header pagination and deterministic data. Counts every request, the
+bytes sent back and the most requests that were in flight at once.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+USER_ID = 1
+
+
+class FakeCanvas:
+    def __init__(self, courses: int = 6, assignments: int = 40, latency: float = 0.05,
+                 classmates: int = 0):
+        self.courses = courses
+        self.assignments = assignments
+        self.latency = latency
+        # Other students whose enrollments an unfiltered GraphQL query would list
+        self.classmates = classmates
+        self.requests = 0
+        self.bytes_sent = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> 'FakeCanvas':
+        fake = self
+
+        class Handler(_Handler):
+            canvas = fake
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def begin(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def end(self, sent: int = 0):
+        with self._lock:
+            self.in_flight -= 1
+            self.bytes_sent += sent
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.peak_in_flight = 0
+
+    def course_list(self):
+        return [{'id': course_id, 'name': f'Course {course_id}', 'course_code': f'C{course_id}',
+                 'updated_at': '2026-01-01T00:00:00Z', 'term': {'name': 'Fall 2026'},
+                 'teachers': [{'display_name': f'Professor {course_id}'}]}
+                for course_id in range(1, self.courses + 1)]
+
+    def assignment_list(self, course_id: int):
+        items = []
+        for i in range(self.assignments):
+            submitted = i % 2 == 0
+            items.append({
+                'id': course_id * 1000 + i,
+                'course_id': course_id,
+                'name': f'Assignment {i}',
+                'description': '<p>' + 'Read the chapter and answer the questions. ' * 10 + '</p>',
+                'due_at': f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}T23:59:00Z' if i % 10 else None,
+                'points_possible': 10,
+                'html_url': f'{self.url}/courses/{course_id}/assignments/{i}',
+                'updated_at': '2026-01-01T00:00:00Z',
+                'submission_types': ['online_upload'],
+                'submission': {
+                    'grade': 'A' if submitted else None,
+                    'score': 9.5 if submitted else None,
+                    'submitted_at': '2026-01-02T00:00:00Z' if submitted else None,
+                    'workflow_state': 'graded' if submitted else 'unsubmitted'
+                }
+            })
+        return items
+
+    def enrollment(self, course_id: int):
+        return {'type': 'StudentEnrollment', 'course_id': course_id, 'user_id': USER_ID,
+                'enrollment_state': 'active',
+                'grades': {'current_score': 80.0 + course_id % 20,
+                           'final_score': 75.0 + course_id % 20}}
+
+    def _assignment_page(self, course_id: int, first: int, after: Optional[str]):
+        start = int(after or 0)
+        items = self.assignment_list(course_id)
+        nodes = [{
+            '_id': str(a['id']),
+            'name': a['name'],
+            'description': a['description'],
+            'dueAt': a['due_at'],
+            'pointsPossible': a['points_possible'],
+            'htmlUrl': a['html_url'],
+            'updatedAt': a['updated_at'],
+            'submissionsConnection': {'nodes': [{
+                'grade': a['submission']['grade'],
+                'score': a['submission']['score'],
+                'submittedAt': a['submission']['submitted_at'],
+                'state': a['submission']['workflow_state']
+            }]}
+        } for a in items[start:start + first]]
+        more = start + first < len(items)
+        return {'nodes': nodes,
+                'pageInfo': {'hasNextPage': more, 'endCursor': str(start + first) if more else None}}
+
+    def _enrollment_nodes(self, course_id: int, user_ids: Optional[List[str]]):
+        enrollment = self.enrollment(course_id)
+        nodes = [{'state': 'active', 'user': {'_id': str(USER_ID + n)},
+                  'grades': {'currentScore': enrollment['grades']['current_score'] - n % 7,
+                             'currentGrade': None,
+                             'finalScore': enrollment['grades']['final_score'] - n % 7}}
+                 for n in range(self.classmates + 1)]
+        if user_ids is not None:
+            nodes = [node for node in nodes if node['user']['_id'] in user_ids]
+        return nodes
+
+    def graphql(self, query: str, variables: dict):
+        first = variables.get('first', 10)
+        if 'allCourses' not in query:
+            course_id = int(variables['courseId'])
+            return {'course': {'assignmentsConnection': self._assignment_page(
+                course_id, first, variables.get('after'))}}
+        user_ids = [variables['userId']] if 'userIds' in query else None
+        return {'allCourses': [{
+            '_id': str(course['id']),
+            'name': course['name'],
+            'courseCode': course['course_code'],
+            'updatedAt': course['updated_at'],
+            'applyGroupWeights': False,
+            'term': course['term'],
+            'enrollmentsConnection': {'nodes': self._enrollment_nodes(course['id'], user_ids)},
+            'assignmentsConnection': self._assignment_page(course['id'], first, None)
+        } for course in self.course_list()]}
+
+    def route(self, path: str, query: dict):
+        if path == '/api/v1/users/self':
+            return {'id': USER_ID, 'name': 'Test Student'}
+        if path == '/api/v1/users/self/avatars':
+            return [{'url': f'{self.url}/avatar.png'}]
+        if path == '/api/v1/courses':
+            return self.course_list()
+        match = re.fullmatch(r'/api/v1/courses/(\d+)/(enrollments|assignments)', path)
+        if match:
+            course_id = int(match.group(1))
+            if match.group(2) == 'enrollments':
+                return [self.enrollment(course_id)]
+            return self.assignment_list(course_id)
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    canvas: FakeCanvas = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body, headers=None):
+        data = json.dumps(body).encode()
+        self.sent = len(data)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._handle(self._get)
+
+    def do_POST(self):
+        self._handle(self._post)
+
+    def _handle(self, respond):
+        self.sent = 0
+        self.canvas.begin()
+        try:
+            time.sleep(self.canvas.latency)
+            respond()
+        finally:
+            self.canvas.end(self.sent)
+
+    def _post(self):
+        if urlparse(self.path).path != '/api/graphql':
+            self._send(404, {'errors': [{'message': 'not found'}]})
+            return
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self._send(200, {'data': self.canvas.graphql(request['query'], request.get('variables') or {})})
+
+    def _get(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        body = self.canvas.route(url.path, query)
+        if body is None:
+            self._send(404, {'errors': [{'message': 'not found'}]})
+            return
+        headers = {}
+        if isinstance(body, list):
+            page = int(query.get('page', ['1'])[0])
+            per_page = int(query.get('per_page', ['10'])[0])
+            if page * per_page < len(body):
+                query['page'] = [str(page + 1)]
+                headers['Link'] = f'<{self.canvas.url}{url.path}?{urlencode(query, doseq=True)}>; rel="next"'
+            body = body[(page - 1) * per_page:page * per_page]
+        self._send(200, body, headers)
@@ -0,0 +1,173 @@
+"""A local stand-in for the Gmail API, used by the benchmarks.
+
+Serves messages.list/get, getProfile, history.list and the batch endpoint
+with a fixed per-request latency, and counts HTTP round trips. A batch of
+50 messages is one round trip, as it is against Gmail.
+"""
+import base64
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SENDERS = ['prof.a@school.edu', 'prof.b@school.edu', 'dean@school.edu', 'advisor@school.edu']
+
+
+def _encode(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+
+class FakeGmail:
+    def __init__(self, per_sender: int = 50, latency: float = 0.02):
+        self.latency = latency
+        self.requests = 0
+        self.history_id = 5000
+        self.messages = {}
+        self._lock = threading.Lock()
+        self._server = None
+        for s, sender in enumerate(SENDERS):
+            for i in range(per_sender):
+                message_id = f'{s:02d}{i:05d}'
+                self.messages[message_id] = {
+                    'id': message_id,
+                    'threadId': message_id,
+                    'historyId': str(1000 + i),
+                    'internalDate': str(1760000000000 + i * 60000 + s),
+                    'snippet': f'Reminder {i} about the reading for this week',
+                    'payload': {
+                        'mimeType': 'multipart/alternative',
+                        'headers': [{'name': 'Subject', 'value': f'Update {i}'},
+                                    {'name': 'From', 'value': f'Professor {s} <{sender}>'},
+                                    {'name': 'Date', 'value': 'Mon, 12 Oct 2026 09:00:00 +0000'}],
+                        'parts': [
+                            {'mimeType': 'text/plain', 'body': {'data': _encode(f'Hello class, update {i}.\n' * 40)}},
+                            {'mimeType': 'text/html', 'body': {'data': _encode(f'<p>Hello class, update {i}.</p>' * 40)}}
+                        ]
+                    }
+                }
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    def start(self) -> 'FakeGmail':
+        fake = self
+
+        class Handler(_Handler):
+            gmail = fake
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+
+    def build_service(self):
+        """A googleapiclient Gmail service pointed at this server"""
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+        from googleapiclient.http import BatchHttpRequest
+
+        credentials = Credentials(token='benchmark')
+        service = build('gmail', 'v1', credentials=credentials, static_discovery=True,
+                        client_options={'api_endpoint': self.url})
+        # The batch URI comes from the discovery document, not api_endpoint
+        batch_uri = self.url + 'batch/gmail/v1'
+        service.new_batch_http_request = lambda callback=None: BatchHttpRequest(
+            callback=callback, batch_uri=batch_uri)
+        return service, credentials
+
+    def _list(self, query: dict):
+        wanted = set(re.findall(r'[\w.]+@[\w.]+', query.get('q', [''])[0]))
+        ids = sorted((m for m in self.messages if self._sender(m) in wanted),
+                     key=lambda m: -int(self.messages[m]['internalDate']))
+        start = int(query.get('pageToken', ['0'])[0])
+        count = int(query.get('maxResults', ['100'])[0])
+        result = {'messages': [{'id': m, 'threadId': m} for m in ids[start:start + count]],
+                  'resultSizeEstimate': len(ids)}
+        if start + count < len(ids):
+            result['nextPageToken'] = str(start + count)
+        return result
+
+    def _sender(self, message_id: str) -> str:
+        return SENDERS[int(message_id[:2])]
+
+    def _get(self, message_id: str, query: dict):
+        message = json.loads(json.dumps(self.messages[message_id]))
+        if query.get('format', ['full'])[0] == 'metadata':
+            names = {name.lower() for name in query.get('metadataHeaders', [])}
+            message['payload'] = {
+                'mimeType': message['payload']['mimeType'],
+                'headers': [h for h in message['payload']['headers'] if h['name'].lower() in names]
+            }
+        return message
+
+    def route(self, path: str):
+        url = urlparse(path)
+        query = parse_qs(url.query)
+        if url.path.endswith('/users/me/messages'):
+            return 200, self._list(query)
+        match = re.search(r'/users/me/messages/([^/]+)$', url.path)
+        if match:
+            if match.group(1) not in self.messages:
+                return 404, {'error': {'code': 404, 'message': 'Requested entity was not found.'}}
+            return 200, self._get(match.group(1), query)
+        if url.path.endswith('/users/me/profile'):
+            return 200, {'emailAddress': 'student@school.edu', 'historyId': str(self.history_id)}
+        if url.path.endswith('/users/me/history'):
+            return 200, {'history': [], 'historyId': str(self.history_id)}
+        return 404, {'error': {'code': 404, 'message': f'No route for {url.path}'}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    gmail: FakeGmail = None
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, data: bytes, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.gmail.count()
+        time.sleep(self.gmail.latency)
+        status, body = self.gmail.route(self.path)
+        self._send(status, json.dumps(body).encode())
+
+    def do_POST(self):
+        self.gmail.count()
+        time.sleep(self.gmail.latency)
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        boundary = self.headers['Content-Type'].split('boundary=')[1].strip('"')
+        parts = []
+        for part in body.split('--' + boundary)[1:-1]:
+            content_id = re.search(r'Content-ID: <([^>]+)>', part).group(1)
+            path = re.search(r'\n(?:GET|POST) (\S+) HTTP', part).group(1)
+            status, payload = self.gmail.route(path)
+            data = json.dumps(payload)
+            parts.append(f"--batch_response\r\nContent-Type: application/http\r\n"
+                         f"Content-ID: <response-{content_id}>\r\n\r\n"
+                         f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(data)}\r\n\r\n{data}\r\n")
+        data = (''.join(parts) + '--batch_response--\r\n').encode()
+        self._send(200, data, 'multipart/mixed; boundary=batch_response')
@@ -4,4 +4,70 @@ import os
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
\ No newline at end of file
+YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
+
+# Canvas fan-out: maximum number of per-course requests in flight at once, process-wide
+CANVAS_MAX_WORKERS = int(os.getenv('CANVAS_MAX_WORKERS', '8'))
+
+# Canvas transport: shared connection pool, timeouts and retry/backoff
+CANVAS_TIMEOUT = float(os.getenv('CANVAS_TIMEOUT', '10'))
+CANVAS_MAX_RETRIES = int(os.getenv('CANVAS_MAX_RETRIES', '3'))
+CANVAS_POOL_SIZE = int(os.getenv('CANVAS_POOL_SIZE', str(max(10, CANVAS_MAX_WORKERS))))
+CANVAS_BACKOFF_BASE = float(os.getenv('CANVAS_BACKOFF_BASE', '0.5'))
+CANVAS_BACKOFF_MAX = float(os.getenv('CANVAS_BACKOFF_MAX', '30'))
+# Start pacing requests when X-Rate-Limit-Remaining drops below this
+CANVAS_RATE_LIMIT_FLOOR = float(os.getenv('CANVAS_RATE_LIMIT_FLOOR', '100'))
+
+# Shared cache: backend ('memory', 'sqlite' or 'redis'), LRU size bound
+# and per-resource TTLs in seconds
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', 'cache.sqlite3')
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', '300'))
+# How long past its TTL a stale-while-revalidate entry may still be served
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', '3600'))
+CACHE_TTLS = {
+    'courses': int(os.getenv('CACHE_TTL_COURSES', '900')),
+    'grades': int(os.getenv('CACHE_TTL_GRADES', '300')),
+    'assignments': int(os.getenv('CACHE_TTL_ASSIGNMENTS', '300')),
+    'avatar': int(os.getenv('CACHE_TTL_AVATAR', '3600')),
+    'user_name': int(os.getenv('CACHE_TTL_USER_NAME', '3600')),
+    'ai': int(os.getenv('CACHE_TTL_AI', '86400')),
+    'pages': int(os.getenv('CACHE_TTL_PAGES', '300')),
+    # ETag/Last-Modified validators and the bodies they belong to
+    'validators': int(os.getenv('CACHE_TTL_VALIDATORS', '86400')),
+}
+
+# Background Canvas sync into a local SQLite store; 0 disables the worker
+CANVAS_SYNC_INTERVAL = int(os.getenv('CANVAS_SYNC_INTERVAL', '300'))
+CANVAS_STORE_PATH = os.getenv('CANVAS_STORE_PATH', 'canvas_store.sqlite3')
+# Reads fall back to Canvas once the last complete sync is older than this (seconds)
+CANVAS_STORE_MAX_AGE = int(os.getenv('CANVAS_STORE_MAX_AGE', str(3 * CANVAS_SYNC_INTERVAL)))
+
+# Server-Sent Events: seconds between keep-alives and events kept for reconnects
+EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', '15'))
+EVENTS_HISTORY = int(os.getenv('EVENTS_HISTORY', '100'))
+# How often the inbox watcher checks allowed senders for new mail; 0 disables it
+INBOX_POLL_INTERVAL = int(os.getenv('INBOX_POLL_INTERVAL', '300'))
+
+# Gmail: messages fetched per batch request (Gmail allows up to 100, advises 50)
+GMAIL_BATCH_SIZE = int(os.getenv('GMAIL_BATCH_SIZE', '50'))
+# Rate-limited or failed messages in a batch are sent again, with jittered
+# exponential backoff from GMAIL_BACKOFF_BASE seconds, this many times
+GMAIL_MAX_RETRIES = int(os.getenv('GMAIL_MAX_RETRIES', '3'))
+GMAIL_BACKOFF_BASE = float(os.getenv('GMAIL_BACKOFF_BASE', '1'))
+# Local copy of the allowed senders' mail, and how many messages the first sync downloads
+INBOX_STORE_PATH = os.getenv('INBOX_STORE_PATH', 'inbox_store.sqlite3')
+INBOX_SYNC_LIMIT = int(os.getenv('INBOX_SYNC_LIMIT', '500'))
+# Opened message bodies kept in memory, the characters kept per body,
+# and the length of the one-line previews in the inbox list
+INBOX_BODY_CACHE_ENTRIES = int(os.getenv('INBOX_BODY_CACHE_ENTRIES', '200'))
+INBOX_BODY_MAX_CHARS = int(os.getenv('INBOX_BODY_MAX_CHARS', '100000'))
+INBOX_SNIPPET_CHARS = int(os.getenv('INBOX_SNIPPET_CHARS', '160'))
+
+# Credit hours assumed for a course when computing GPA and class standing
+GRADE_CREDITS_PER_COURSE = float(os.getenv('GRADE_CREDITS_PER_COURSE', '3'))
+
+# 'rest' or 'graphql': how the dashboard's courses, grades and assignments are fetched
+CANVAS_FETCH_MODE = os.getenv('CANVAS_FETCH_MODE', 'rest')
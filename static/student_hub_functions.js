@@ -59,19 +59,10 @@ document.addEventListener('DOMContentLoaded', function() {
         window.location.href = `/check-inbox?sender=${encodeURIComponent(sender)}`;
     });
 
-    // Add auto-refresh functionality for inbox (every 5 minutes)
-    if (window.location.pathname === '/check-inbox') {
-        setInterval(function() {
-            const currentSender = document.getElementById('senderSelect')?.value;
-            if (currentSender) {
-                window.location.href = `/check-inbox?sender=${encodeURIComponent(currentSender)}`;
-            }
-        }, 300000); // 5 minutes in milliseconds
-    }
-
     // Add calendar functionality
-    const calendar = document.querySelector('.calendar');
-    if (calendar) {
+    let calendar = document.querySelector('.calendar');
+    // Wire up assignment cells; called again whenever a month is rendered
+    function bindCalendarAssignments() {
         // Add hover effect for assignment cells
         const assignmentCells = document.querySelectorAll('.day .assignment');
         assignmentCells.forEach(cell => {
@@ -148,17 +139,111 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    // Add calendar navigation (if needed later)
-    function updateCalendar(year, month) {
-        // This function can be implemented later if you want to add
-        // month navigation functionality
-        fetch(`/api/calendar?year=${year}&month=${month}`)
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text ?? '';
+        return div.innerHTML;
+    }
+
+    // Month navigation: fetch one month from /api/calendar and redraw the grid
+    function updateCalendar(year, month, fresh = false) {
+        // fresh skips the browser's cached copy, e.g. after a change was pushed
+        fetch(`/api/calendar?year=${year}&month=${month}`, fresh ? { cache: 'no-cache' } : {})
             .then(response => response.json())
             .then(data => {
-                // Update calendar with new data
+                if (data.error) {
+                    console.error('Error loading calendar:', data.error);
+                    return;
+                }
+                const header = calendar.querySelector('.calendar-header');
+                header.dataset.year = data.year;
+                header.dataset.month = data.month;
+                header.querySelector('h3').textContent = data.label;
+
+                const grid = calendar.querySelector('.calendar-grid');
+                grid.querySelectorAll('.day').forEach(day => day.remove());
+                grid.insertAdjacentHTML('beforeend', data.days.map(day => `
+                    <div class="day ${day.is_today ? 'today' : ''} ${day.in_month ? '' : 'other-month'}">
+                        ${day.day}
+                        ${day.assignments.length ? `
+                            <div class="assignments">
+                                ${day.assignments.map(assignment => `
+                                    <div class="assignment"
+                                         data-course-id="${assignment.course_id}"
+                                         data-assignment-id="${assignment.id}"
+                                         title="${escapeHtml(assignment.name)}">
+                                        ${escapeHtml(assignment.name)}
+                                    </div>
+                                `).join('')}
+                            </div>
+                        ` : ''}
+                    </div>
+                `).join(''));
+                bindCalendarAssignments();
+            })
+            .catch(error => {
+                console.error('Error loading calendar:', error);
             });
     }
 
+    function initCalendar() {
+        calendar = document.querySelector('.calendar');
+        if (!calendar) return;
+        bindCalendarAssignments();
+        calendar.querySelectorAll('.calendar-nav').forEach(button => {
+            button.addEventListener('click', function() {
+                const header = calendar.querySelector('.calendar-header');
+                // Step through months as a single counter so December wraps into January
+                const index = Number(header.dataset.year) * 12 + Number(header.dataset.month) - 1
+                    + Number(this.dataset.step);
+                updateCalendar(Math.floor(index / 12), index % 12 + 1);
+            });
+        });
+    }
+    initCalendar();
+
+    // Dashboard panels are separate cached fragments loaded in parallel,
+    // so a slow one never holds up the others
+    document.querySelectorAll('.dashboard-fragment[data-fragment]').forEach(container => {
+        fetch(container.dataset.fragment)
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.text();
+            })
+            .then(html => {
+                container.innerHTML = html;
+                if (container.querySelector('.calendar')) {
+                    initCalendar();
+                }
+            })
+            .catch(error => {
+                console.error(`Error loading ${container.dataset.fragment}:`, error);
+                const loading = container.querySelector('.fragment-loading');
+                if (loading) loading.textContent = 'Could not load this section.';
+            });
+    });
+
+    // Live updates: grade and assignment changes are pushed from /api/events
+    // instead of reloading the dashboard
+    if (document.querySelector('.dashboard-fragment') && window.EventSource) {
+        const events = new EventSource('/api/events');
+        events.addEventListener('grades', event => {
+            const data = JSON.parse(event.data);
+            Object.entries(data.grades).forEach(([courseId, grade]) => {
+                const bubble = document.querySelector(`.class-button[data-course-id="${courseId}"] .grade-bubble`);
+                if (bubble) bubble.textContent = grade;
+            });
+            const gpa = document.querySelector('.gpa-value');
+            if (gpa) gpa.textContent = data.gpa ?? 'N/A';
+        });
+        events.addEventListener('assignments', () => {
+            const header = calendar?.querySelector('.calendar-header');
+            if (header) {
+                updateCalendar(Number(header.dataset.year), Number(header.dataset.month), true);
+            }
+        });
+    }
+
     // Add this with your other event listeners
     document.getElementById('todo-list')?.addEventListener('click', function() {
         window.location.href = '/todo-list';
@@ -189,12 +274,12 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // Add this with your other event listeners
-    const classButtons = document.querySelectorAll('.class-button');
-    classButtons.forEach(button => {
-        button.addEventListener('click', function() {
-            const courseId = this.dataset.courseId;
-            window.location.href = `/course/${courseId}`;
-        });
+    // Delegated so class buttons loaded later with the dashboard fragment work too
+    document.addEventListener('click', function(e) {
+        const button = e.target.closest('.class-button');
+        if (button) {
+            window.location.href = `/course/${button.dataset.courseId}`;
+        }
     });
 
     // Add event listener for graphing calculator